@@ -0,0 +1,199 @@
+import io
+import lzma
+import zlib
+import tarfile
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 按 zip 格式处理的扩展名（jar/war/apk 等本质上都是 zip）
+ZIP_EXTENSIONS = ('.zip', '.jar', '.war', '.ear', '.apk', '.aar', '.aab', '.whl', '.nupkg', '.xpi', '.crx')
+TAR_EXTENSIONS = ('.tar', '.tgz', '.tbz2', '.txz', '.tar.gz', '.tar.bz2', '.tar.xz')
+
+# 读取单个成员时可能出现的错误：加密（RuntimeError）、不支持的压缩方式（NotImplementedError）、
+# 数据损坏（zlib.error、BadZipFile、CRC 校验失败）等，出错的成员计为跳过，不影响其他成员
+MEMBER_ERRORS = (
+    RuntimeError, NotImplementedError, ValueError, EOFError, OSError,
+    zlib.error, lzma.LZMAError, zipfile.BadZipFile, tarfile.TarError,
+)
+
+# 压缩包内成员路径的分隔符，与 Java 的 jar URL 写法一致：app.war!/WEB-INF/web.xml
+MEMBER_SEPARATOR = '!/'
+
+
+def is_archive(name):
+    """根据文件名判断是否为支持的压缩包"""
+    name = name.lower()
+    return name.endswith(ZIP_EXTENSIONS) or name.endswith(TAR_EXTENSIONS)
+
+
+def read_member(path, data=None, max_member_size=None):
+    """按 app.war!/WEB-INF/lib/x.jar!/config.properties 形式的路径读取（嵌套）压缩包成员的内容
+
+    data 为最外层压缩包的内容，为 None 时从路径的第一段读取。
+    """
+    parts = path.split(MEMBER_SEPARATOR)
+    source = parts[0] if data is None else data
+    for depth, name in enumerate(parts[1:]):
+        container = parts[depth]
+        fileobj = source if isinstance(source, str) else io.BytesIO(source)
+        if container.lower().endswith(ZIP_EXTENSIONS):
+            with zipfile.ZipFile(fileobj) as archive:
+                with archive.open(name) as member:
+                    source = member.read(max_member_size + 1 if max_member_size else -1)
+        else:
+            if isinstance(fileobj, str):
+                archive = tarfile.open(fileobj, mode='r:*')
+            else:
+                archive = tarfile.open(fileobj=fileobj, mode='r:*')
+            with archive:
+                member = archive.extractfile(name)
+                if member is None:
+                    raise KeyError(name)
+                source = member.read(max_member_size + 1 if max_member_size else -1)
+        if max_member_size and len(source) > max_member_size:
+            raise ValueError(f"压缩包成员过大: {name}")
+    return source
+
+
+class ArchiveScanner:
+    """在内存中遍历压缩包（zip/jar/war/apk/tar 等）并扫描其中的成员，不解压到磁盘
+
+    scan_member(显示路径, 内容bytes) 负责扫描单个成员并返回结果列表。
+    嵌套的压缩包会递归处理，直到 max_depth 层；单个成员超过 max_member_size、
+    或整个压缩包累计解压超过 max_total_size 的部分会被跳过，防止压缩炸弹。
+    加密、损坏或使用不支持的压缩方式的成员同样计为跳过。
+    最外层压缩包的成员由线程池并行读取和扫描（zlib 解压期间会释放 GIL）。
+    """
+
+    def __init__(self, scan_member, member_filter=None, should_stop=None, max_depth=3,
+                 max_member_size=10 * 1024 * 1024, max_total_size=1024 * 1024 * 1024, workers=4):
+        self.scan_member = scan_member
+        self.member_filter = member_filter or (lambda name: True)
+        self.should_stop = should_stop or (lambda: False)
+        self.max_depth = max_depth
+        self.max_member_size = max_member_size
+        self.max_total_size = max_total_size
+        self.workers = workers
+        self.skipped = 0   # 因大小、深度限制或无法读取被跳过的成员数
+        self.lock = threading.Lock()
+
+    def scan(self, source, display_path, depth=0):
+        """扫描压缩包，source 可以是文件路径或 bytes"""
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+
+        name = display_path.rsplit(MEMBER_SEPARATOR, 1)[-1]
+        if name.lower().endswith(ZIP_EXTENSIONS):
+            return self._scan_zip(source, display_path, depth)
+        return self._scan_tar(source, display_path, depth)
+
+    def _skip(self):
+        with self.lock:
+            self.skipped += 1
+
+    def _accept(self, name, size):
+        if size > self.max_member_size:
+            self._skip()
+            return False
+        return is_archive(name) or self.member_filter(name)
+
+    def _scan_data(self, display_path, name, data, depth):
+        if is_archive(name):
+            if depth + 1 > self.max_depth:
+                self._skip()
+                return []
+            try:
+                return self.scan(data, display_path, depth + 1)
+            except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError):
+                return []
+        return self.scan_member(display_path, data)
+
+    def _scan_zip(self, source, display_path, depth):
+        with zipfile.ZipFile(source) as archive:
+            members = []
+            total = 0
+            for info in archive.infolist():
+                if info.is_dir() or not self._accept(info.filename, info.file_size):
+                    continue
+                total += info.file_size
+                if total > self.max_total_size:
+                    self._skip()
+                    continue
+                members.append(info)
+
+            def scan_info(info):
+                if self.should_stop():
+                    return []
+                # 按声明大小+1读取，声明大小与实际不符的成员（压缩炸弹）直接丢弃
+                try:
+                    with archive.open(info) as member:
+                        data = member.read(self.max_member_size + 1)
+                except MEMBER_ERRORS:
+                    self._skip()
+                    return []
+                if len(data) > self.max_member_size:
+                    self._skip()
+                    return []
+                member_path = display_path + MEMBER_SEPARATOR + info.filename
+                return self._scan_data(member_path, info.filename, data, depth)
+
+            results = []
+            if depth == 0 and self.workers > 1:
+                with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                    for member_results in pool.map(scan_info, members):
+                        results.extend(member_results)
+            else:
+                for info in members:
+                    results.extend(scan_info(info))
+            return results
+
+    def _scan_tar(self, source, display_path, depth):
+        if isinstance(source, str):
+            archive = tarfile.open(source, mode='r:*')
+        else:
+            archive = tarfile.open(fileobj=source, mode='r:*')
+
+        results = []
+        total = 0
+        pending = deque()
+        pool = ThreadPoolExecutor(max_workers=self.workers) if depth == 0 and self.workers > 1 else None
+        try:
+            # tar 只能顺序读取，成员内容读出后交给线程池扫描，同时在途的成员数量有上限
+            for info in archive:
+                if self.should_stop():
+                    break
+                if not info.isfile() or not self._accept(info.name, info.size):
+                    continue
+                total += info.size
+                if total > self.max_total_size:
+                    self._skip()
+                    break
+
+                # tar 是连续的数据流，读取出错后无法定位到下一个成员，保留已有结果并结束
+                try:
+                    member = archive.extractfile(info)
+                    if member is None:
+                        continue
+                    data = member.read()
+                except MEMBER_ERRORS:
+                    self._skip()
+                    break
+                member_path = display_path + MEMBER_SEPARATOR + info.name
+
+                if pool is None:
+                    results.extend(self._scan_data(member_path, info.name, data, depth))
+                    continue
+                pending.append(pool.submit(self._scan_data, member_path, info.name, data, depth))
+                if len(pending) >= self.workers * 2:
+                    results.extend(pending.popleft().result())
+
+            while pending:
+                results.extend(pending.popleft().result())
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+            archive.close()
+        return results
+
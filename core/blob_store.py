@@ -0,0 +1,186 @@
+import os
+import stat
+import uuid
+import shutil
+import tempfile
+
+from core.scan_cache import hash_file
+from core.utils import get_cache_dir
+
+# 存储对象设为只读，经硬链接修改镜像文件时不会改掉其他 URL 共享的同一份内容
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+# 未被任何镜像文件引用的存储对象（链接数为 1）最多保留的总大小，超出时从最久未修改的开始删除
+MAX_ORPHAN_BYTES = 512 * 1024 * 1024
+
+
+def remove_file(path):
+    """删除文件；Windows 上只读文件不能直接删除，先清除只读属性"""
+    try:
+        os.remove(path)
+    except PermissionError:
+        if os.name != 'nt':
+            raise
+        os.chmod(path, stat.S_IWRITE)
+        os.remove(path)
+
+
+def replace_file(source_path, target_path, store=None):
+    """用 source_path 原子替换 target_path
+
+    Windows 上不能替换只读文件（例如指向存储对象的硬链接）：先删除旧文件再改名。
+    清除只读属性会作用于共享数据的存储对象，删除后按旧文件的内容哈希把存储对象恢复为只读。
+    """
+    try:
+        os.replace(source_path, target_path)
+        return
+    except PermissionError:
+        if os.name != 'nt' or not os.path.exists(target_path):
+            raise
+    blob_path = None
+    if store is not None and os.stat(target_path).st_nlink > 1:
+        blob_path = store.path(hash_file(target_path))
+    remove_file(target_path)
+    os.replace(source_path, target_path)
+    if blob_path and os.path.exists(blob_path):
+        os.chmod(blob_path, READ_ONLY)
+
+
+class BlobStore:
+    """按内容哈希寻址的文件存储
+
+    每份内容只在存储目录中保存一次（<root>/ab/cdef...），镜像目录中按 URL 路径排列的文件
+    是指向存储对象的只读硬链接。带缓存参数的 URL、CDN 镜像以及不同站点上相同的第三方库
+    因此只占用一份磁盘空间，扫描器的缓存也可以按内容哈希复用结果。
+    输出目录无法硬链接到存储目录时（不同磁盘、FAT 等文件系统）应当不使用存储，见 can_link。
+
+    多个下载线程可以同时调用 put/link：所有写入都先写入名称唯一的临时文件，
+    存储对象以硬链接方式创建，已存在时不会被替换；收入存储前会重新计算内容哈希，
+    存储对象的内容始终与其哈希一致。
+    """
+
+    def __init__(self, root=None):
+        self.root = root or get_cache_dir("blobs")
+
+    def path(self, content_hash):
+        return os.path.join(self.root, content_hash[:2], content_hash[2:])
+
+    def contains(self, content_hash):
+        return os.path.exists(self.path(content_hash))
+
+    def can_link(self, directory):
+        """directory 中的文件能否硬链接到存储对象"""
+        os.makedirs(self.root, exist_ok=True)
+        fd, probe = tempfile.mkstemp(dir=self.root, suffix='.probe')
+        os.close(fd)
+        target = os.path.join(directory, f".{uuid.uuid4().hex[:12]}.probe")
+        try:
+            os.link(probe, target)
+        except OSError:
+            return False
+        else:
+            os.remove(target)
+            return True
+        finally:
+            os.remove(probe)
+
+    def put(self, source_path, content_hash):
+        """把已写好的临时文件收入存储，返回 (存储路径, 内容是否已经存在)
+
+        临时文件随后被删除；临时文件的内容与哈希不符时抛出 ValueError，不会写入存储。
+        """
+        blob_path = self.path(content_hash)
+        if os.path.exists(blob_path):
+            os.remove(source_path)
+            return blob_path, True
+
+        if hash_file(source_path) != content_hash:
+            raise ValueError(f"文件内容与哈希不一致: {source_path}")
+
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        try:
+            duplicate = not self._link_new(source_path, blob_path)
+        except OSError:
+            # 临时文件与存储目录不在同一设备上，先复制到存储目录中
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(blob_path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f, open(source_path, 'rb') as source:
+                    shutil.copyfileobj(source, f)
+                duplicate = not self._link_new(temp_path, blob_path)
+            finally:
+                os.remove(temp_path)
+        os.remove(source_path)
+        if not duplicate:
+            os.chmod(blob_path, READ_ONLY)
+        return blob_path, duplicate
+
+    @staticmethod
+    def _link_new(source_path, blob_path):
+        """以硬链接创建存储对象，对象已存在（其他线程刚收入同样的内容）时返回 False"""
+        try:
+            os.link(source_path, blob_path)
+        except FileExistsError:
+            return False
+        return True
+
+    def link(self, blob_path, target_path):
+        """让 target_path 指向存储对象（替换已有文件），返回是否使用了硬链接
+
+        无法建立硬链接时（例如超过文件系统的链接数上限）复制一份可写的文件。
+        """
+        try:
+            if os.path.samefile(blob_path, target_path):
+                return True
+        except OSError:
+            pass
+        temp_path = f"{target_path}.{uuid.uuid4().hex[:12]}.link"
+        try:
+            try:
+                os.link(blob_path, temp_path)
+                linked = True
+            except OSError:
+                shutil.copyfile(blob_path, temp_path)
+                linked = False
+            replace_file(temp_path, target_path, self)
+        finally:
+            # 另一个线程已把 target_path 链接到同一存储对象时 rename 不做任何事，临时链接仍然存在
+            if os.path.lexists(temp_path):
+                remove_file(temp_path)
+        return linked
+
+    def prune(self, max_orphan_bytes=MAX_ORPHAN_BYTES):
+        """删除未被镜像文件引用的存储对象，直到它们的总大小不超过 max_orphan_bytes
+
+        被引用的对象与镜像文件共享数据，删除它们不会释放空间；未被引用的对象只用于之后的去重，
+        从最久未修改的开始删除。返回 (删除的对象数, 释放的字节数)。
+        """
+        orphans = []
+        try:
+            directories = [entry.path for entry in os.scandir(self.root) if entry.is_dir()]
+        except OSError:
+            return 0, 0
+        for directory in directories:
+            try:
+                for entry in os.scandir(directory):
+                    if not entry.is_file() or entry.name.endswith(('.tmp', '.probe')):
+                        continue
+                    # DirEntry.stat() 在 Windows 上不包含链接数，需要调用 os.stat
+                    info = os.stat(entry.path)
+                    if info.st_nlink <= 1:
+                        orphans.append((info.st_mtime_ns, info.st_size, entry.path))
+            except OSError:
+                continue
+
+        total = sum(size for _, size, _ in orphans)
+        removed = freed = 0
+        for _, size, path in sorted(orphans):
+            if total <= max_orphan_bytes:
+                break
+            try:
+                remove_file(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
@@ -0,0 +1,74 @@
+import re
+import codecs
+
+# 二进制文件识别：只检查文件开头的一个数据块，在解码和正则扫描之前排除二进制文件
+
+SNIFF_SIZE = 8192
+
+# 常见二进制格式的文件头
+BINARY_SIGNATURES = (
+    b'\x89PNG', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'II*\x00', b'MM\x00*',
+    b'PK\x03\x04', b'PK\x05\x06', b'\x1f\x8b', b'7z\xbc\xaf\x27\x1c', b'Rar!',
+    b'\xfd7zXZ\x00', b'\x28\xb5\x2f\xfd',
+    b'\x7fELF', b'\xca\xfe\xba\xbe', b'\xcf\xfa\xed\xfe', b'\xce\xfa\xed\xfe', b'\x00asm',
+    b'%PDF', b'\xd0\xcf\x11\xe0', b'SQLite format 3\x00', b'OggS', b'fLaC',
+    b'wOFF', b'wOF2', b'\x00\x01\x00\x00\x00',
+)
+
+# 开头只有几个 ASCII 字符的格式，文本文件也可能以这些字符开头，需要匹配完整的文件头：
+# RIFF 容器（WAV/AVI/WebP）、带版本号的 ID3 标签、bzip2 的块头（或空数据流的结束标记）
+BINARY_HEADERS = re.compile(
+    rb'RIFF[\s\S]{4}(?:WAVE|AVI |WEBP)|ID3[\x02-\x04]\x00|BZh[1-9](?:1AY&SY|\x17rE8P\x90)'
+)
+
+# 文本文件的字节序标记及解码使用的编码（UTF-32 LE 的标记以 UTF-16 LE 的标记开头，需要先检查）
+TEXT_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# 文本中常见的控制字符：\t \n \r \f \b 和 ESC
+_TEXT_CONTROL = {0x08, 0x09, 0x0a, 0x0c, 0x0d, 0x1b}
+_CONTROL_BYTES = bytes(b for b in range(32) if b not in _TEXT_CONTROL) + b'\x7f'
+
+# 将不可打印字节替换为空格（保持偏移不变），用于从二进制文件中提取字符串
+_PRINTABLE_TABLE = bytes(
+    b if (0x20 <= b < 0x7f or b in (0x09, 0x0a, 0x0d)) else 0x20 for b in range(256)
+)
+
+
+def is_binary(head, control_ratio=0.3):
+    """根据文件开头的数据块判断是否为二进制文件
+
+    依次检查已知文件头、NUL 字节（与 git/grep 的判断方式一致）和控制字符所占比例。
+    带 UTF-16/UTF-32 BOM 的文件视为文本。
+    """
+    if not head:
+        return False
+    if bom_encoding(head):
+        return False
+    if head.startswith(BINARY_SIGNATURES) or BINARY_HEADERS.match(head):
+        return True
+    if b'\x00' in head:
+        return True
+    control = len(head) - len(head.translate(None, _CONTROL_BYTES))
+    return control / len(head) > control_ratio
+
+
+def printable_bytes(data):
+    """把二进制内容中的不可打印字节替换为空格，保留可打印字符串及其原始偏移"""
+    return data.translate(_PRINTABLE_TABLE)
+
+
+def bom_encoding(head):
+    """根据 UTF-16/UTF-32 字节序标记返回解码使用的编码，没有标记时返回 None"""
+    for bom, encoding in TEXT_BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def decode_text(data):
+    """把文本文件的内容解码为字符串：带 UTF-16/UTF-32 BOM 的按标记的编码解码，其余按 UTF-8 解码"""
+    return data.decode(bom_encoding(data[:4]) or 'utf-8', errors='ignore')
@@ -0,0 +1,102 @@
+import os
+import json
+import sqlite3
+
+from core.url_frontier import dedupe_key, key_hash
+
+# 保存在输出目录中的爬取进度文件
+CRAWL_STATE_FILE = ".ash_crawl_state.db"
+
+# URL 的状态
+STATE_QUEUED = 0
+STATE_DONE = 1
+STATE_FAILED = 2
+STATE_SKIPPED = 3
+
+
+class CrawlState:
+    """网站下载的持久化进度（待下载队列和已访问集合）
+
+    每个被加入队列的 URL 以及每个下载结果都会增量写入 SQLite，停止下载、程序退出或网络出错后
+    可以从上次的位置继续：已完成的文件不再下载，仍在队列中或下载到一半的 URL 重新排队。
+    进度文件保存在输出目录中，随镜像一起移动。
+
+    SQLite 连接只能在创建它的线程中使用，下载线程只在调度循环中访问进度。
+    """
+
+    COMMIT_INTERVAL = 200
+
+    def __init__(self, output_dir):
+        self.db_path = os.path.join(output_dir, CRAWL_STATE_FILE)
+        self.pending = 0
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY,
+                key INTEGER NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                state INTEGER NOT NULL,
+                file_info TEXT
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def exists(output_dir):
+        return os.path.exists(os.path.join(output_dir, CRAWL_STATE_FILE))
+
+    def base_url(self):
+        """上次下载的起始 URL，没有记录时返回 None"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'base_url'").fetchone()
+        return row[0] if row else None
+
+    def reset(self, base_url):
+        """清空旧的进度，开始新的下载"""
+        self.conn.execute("DELETE FROM urls")
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('base_url', ?)", (base_url,))
+        self.conn.commit()
+
+    def restore(self, frontier):
+        """把保存的 URL 按发现顺序恢复到待下载队列中，返回已下载完成的文件信息列表
+
+        尚未下载和下载失败（例如网络中断）的 URL 重新排队。
+        """
+        files = []
+        rows = self.conn.execute("SELECT url, depth, state, file_info FROM urls ORDER BY id")
+        for url, depth, state, file_info in rows:
+            frontier.restore(url, depth, state in (STATE_QUEUED, STATE_FAILED))
+            if state == STATE_DONE and file_info:
+                files.append(json.loads(file_info))
+        return files
+
+    def queued(self, url, depth):
+        """记录新加入队列的 URL"""
+        self.conn.execute(
+            "INSERT OR IGNORE INTO urls (key, url, depth, state) VALUES (?, ?, ?, ?)",
+            (key_hash(dedupe_key(url)), url, depth, STATE_QUEUED)
+        )
+        self._mark_dirty()
+
+    def finished(self, url, file_info=None, state=None):
+        """记录一个 URL 的下载结果；未指定状态时根据是否有文件信息判断成功或失败"""
+        if state is None:
+            state = STATE_DONE if file_info else STATE_FAILED
+        self.conn.execute(
+            "UPDATE urls SET state = ?, file_info = ? WHERE key = ?",
+            (state, json.dumps(file_info, ensure_ascii=False) if file_info else None, key_hash(dedupe_key(url)))
+        )
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        self.pending += 1
+        if self.pending >= self.COMMIT_INTERVAL:
+            self.conn.commit()
+            self.pending = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
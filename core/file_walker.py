@@ -0,0 +1,126 @@
+import os
+import queue
+import threading
+
+
+class ParallelFileWalker:
+    """基于 os.scandir 的并行目录遍历器
+
+    多个线程同时遍历不同的子目录，扩展名、排除目录和文件大小的过滤在遍历过程中完成，
+    直接使用 DirEntry 的 stat 结果，不再对每个文件额外调用 getsize。
+    符合条件的文件放入有界队列，调用方可以边遍历边扫描；队列满时遍历线程会等待，
+    因此内存占用与目录规模无关。
+
+    迭代产生 (文件路径, 文件大小, 修改时间ns)。
+    """
+
+    _DONE = object()
+
+    def __init__(self, root, file_extensions=None, exclude_dirs=None, max_file_size=None,
+                 workers=4, queue_size=10000, name_filter=None):
+        self.root = root
+        self.file_extensions = set(file_extensions or [])
+        self.name_filter = name_filter  # 扩展名不在列表中、但 name_filter(文件名) 为真的文件同样保留
+        self.exclude_dirs = set(exclude_dirs or [])
+        self.max_file_size = max_file_size  # 为 None 时不按大小过滤
+        self.workers = workers
+        self.dir_queue = queue.Queue()
+        self.file_queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.threads = []
+        self.discovered = 0      # 已发现的待扫描文件数
+        self.skipped_large = 0   # 因超过大小限制被跳过的文件数
+        self.finished = False    # 遍历是否已全部完成
+
+    def start(self):
+        self.dir_queue.put(self.root)
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        threading.Thread(target=self._monitor, daemon=True).start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def __iter__(self):
+        while True:
+            item = self.file_queue.get()
+            if item is self._DONE:
+                return
+            yield item
+
+    def _monitor(self):
+        """所有目录处理完毕后结束工作线程，并通知迭代方"""
+        self.dir_queue.join()
+        for _ in self.threads:
+            self.dir_queue.put(None)
+        self.finished = True
+        self._put(self._DONE, force=True)
+
+    def _put(self, item, force=False):
+        # 带超时的写入，避免调用方停止消费后遍历线程永久阻塞
+        while force or not self.stop_event.is_set():
+            try:
+                self.file_queue.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                if force and self.stop_event.is_set():
+                    # 调用方已停止，清空队列后再放入结束标记
+                    self._drain()
+
+    def _drain(self):
+        try:
+            while True:
+                self.file_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _worker(self):
+        while True:
+            dir_path = self.dir_queue.get()
+            if dir_path is None:
+                return
+            try:
+                if not self.stop_event.is_set():
+                    self._scan_dir(dir_path)
+            finally:
+                self.dir_queue.task_done()
+
+    def _scan_dir(self, dir_path):
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if self.stop_event.is_set():
+                        return
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.exclude_dirs:
+                                self.dir_queue.put(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+
+                        # 检查文件扩展名
+                        if self.file_extensions:
+                            ext = os.path.splitext(entry.name)[1].lower()
+                            if ext not in self.file_extensions and not (
+                                    self.name_filter and self.name_filter(entry.name)):
+                                continue
+
+                        # 检查文件大小
+                        stat = entry.stat()
+                        if self.max_file_size is not None and stat.st_size > self.max_file_size:
+                            with self.lock:
+                                self.skipped_large += 1
+                            continue
+                    except OSError:
+                        continue
+
+                    with self.lock:
+                        self.discovered += 1
+                    self._put((entry.path, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            # 与 os.walk 一致，忽略无权限或已删除的目录
+            pass
@@ -0,0 +1,156 @@
+import os
+import re
+import mmap
+from collections import OrderedDict
+
+from core.archive_scanner import MEMBER_SEPARATOR, read_member
+from core.content_sniffer import SNIFF_SIZE, bom_encoding, decode_text, is_binary, printable_bytes
+from core.git_history import GitRepository, find_git_dir
+
+# 扫描时结果只记录位置（文件、行号、列号和匹配内容），上下文在显示或导出时才从源文件中取回，
+# 扫描过程中不再为每个匹配切片和替换换行，内存中的结果也不必携带上下文字符串。
+
+CONTEXT_RADIUS = 50
+
+NEWLINE_BYTES = re.compile(b'\n')
+
+
+class _Source:
+    """一个源文件的内容、按需构建的行起始偏移索引和最近一次解码的行
+
+    压缩后的脚本往往整个文件只有一行、带有上千条结果，解码后的行会被保留下来，
+    同一行的多条结果只解码一次。
+    """
+
+    def __init__(self, data, closer=None):
+        self.data = data
+        self.closer = closer
+        self.line_starts = None
+        self.decoded = (None, '')
+
+    def line(self, number):
+        """返回第 number 行（从 1 开始）的原始字节，不含换行符"""
+        if self.line_starts is None:
+            self.line_starts = [0] + [match.end() for match in NEWLINE_BYTES.finditer(self.data)]
+        if not 1 <= number <= len(self.line_starts):
+            return b''
+        start = self.line_starts[number - 1]
+        end = self.line_starts[number] - 1 if number < len(self.line_starts) else len(self.data)
+        return self.data[start:end]
+
+    def text(self, number):
+        """返回第 number 行解码后的文本（\r 替换为空格）"""
+        if self.decoded[0] != number:
+            self.decoded = (number, self.line(number).decode('utf-8', errors='ignore').replace('\r', ' '))
+        return self.decoded[1]
+
+    def close(self):
+        if self.closer:
+            self.closer()
+
+
+class ContextResolver:
+    """按需取回结果的上下文
+
+    支持普通文件（大文件使用内存映射）、压缩包成员（a.jar!/x.properties）和
+    git 历史中的 blob（结果带有 blob 字段）。最近使用的若干个源文件及其行索引会被缓存，
+    导出时同一文件的多条结果只读取和索引一次。
+    """
+
+    def __init__(self, base_dir=None, max_sources=8):
+        self.base_dir = base_dir
+        self.max_sources = max_sources
+        self.sources = OrderedDict()
+        self.repo = None
+
+    def context(self, finding, radius=CONTEXT_RADIUS):
+        """返回匹配前后各 radius 个字符的上下文（换行替换为空格），源文件不可读时返回空字符串"""
+        if finding.get("context") is not None:
+            return finding["context"]
+        try:
+            source = self._source(finding)
+        except Exception:
+            return ""
+
+        line = source.text(finding.get("line") or 1)
+        match = finding.get("match") or ""
+        column = max(0, (finding.get("column") or 1) - 1)
+        # 分块扫描时列号按字节计算，不小于字符列号，取列号处或之前最近的一处匹配内容
+        position = -1
+        if match:
+            position = line.rfind(match, 0, column + len(match))
+            if position == -1:
+                position = line.find(match)
+        if position == -1:
+            position = min(column, len(line))
+        return line[max(0, position - radius):position + len(match) + radius]
+
+    def with_context(self, findings):
+        """为逐条产生的结果补上上下文，供流式导出使用"""
+        for finding in findings:
+            if finding.get("context") is None:
+                finding = dict(finding, context=self.context(finding))
+            yield finding
+
+    def close(self):
+        for source in self.sources.values():
+            source.close()
+        self.sources.clear()
+        if self.repo:
+            self.repo.close()
+            self.repo = None
+
+    def _source(self, finding):
+        key = finding["file"]
+        source = self.sources.get(key)
+        if source is not None:
+            self.sources.move_to_end(key)
+            return source
+
+        source = self._open(finding)
+        head = source.data[:SNIFF_SIZE]
+        if bom_encoding(head):
+            # 扫描时 UTF-16/UTF-32 文本按解码后的内容计算行列号，转换为 UTF-8 后再按行索引
+            text = decode_text(source.data[:])
+            source.close()
+            source = _Source(text.encode('utf-8'))
+        elif is_binary(head):
+            # 二进制文件的结果来自提取的可打印字符串，按同样的方式转换后再定位
+            printable = printable_bytes(source.data[:])
+            source.close()
+            source = _Source(printable)
+
+        self.sources[key] = source
+        while len(self.sources) > self.max_sources:
+            _, evicted = self.sources.popitem(last=False)
+            evicted.close()
+        return source
+
+    def _open(self, finding):
+        if finding.get("blob"):
+            if self.repo is None:
+                git_dir = find_git_dir(self.base_dir or '')
+                if not git_dir:
+                    raise FileNotFoundError(finding["file"])
+                self.repo = GitRepository(git_dir)
+            data = self.repo.read_blob(bytes.fromhex(finding["blob"]))
+            # git 历史中的结果路径形如 <提交>:<路径>
+            file_path = finding["file"].split(':', 1)[-1]
+            if MEMBER_SEPARATOR in file_path:
+                data = read_member(file_path, data)
+            return _Source(data)
+
+        path = finding["file"]
+        if MEMBER_SEPARATOR in path:
+            return _Source(read_member(path))
+
+        f = open(path, 'rb')
+        if os.fstat(f.fileno()).st_size == 0:
+            f.close()
+            return _Source(b'')
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        def close():
+            buffer.close()
+            f.close()
+        return _Source(buffer, close)
@@ -0,0 +1,146 @@
+import os
+import csv
+import json
+import itertools
+from urllib.parse import quote
+
+# 流式导出扫描结果：输入为逐条产生结果的可迭代对象（例如 iter_sink 或 FindingsIndex），
+# 每条结果写出后即可丢弃，导出过程的内存占用与结果数量无关。
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+SARIF_LEVELS = {"critical": "error", "high": "error", "medium": "warning", "low": "note"}
+
+CSV_FIELDS = ["file", "line", "column", "type", "severity", "match", "context", "fingerprint", "count"]
+
+EXPORT_FORMATS = {
+    ".jsonl": "jsonl",
+    ".sarif": "sarif",
+    ".csv": "csv",
+}
+
+
+def export_format(path):
+    """根据文件扩展名判断导出格式，不是流式格式时返回 None"""
+    name = path.lower()
+    if name.endswith(".sarif.json"):
+        return "sarif"
+    return EXPORT_FORMATS.get(os.path.splitext(name)[1])
+
+
+def export_findings(findings, path, fmt, base_dir=None, tool_name="ash_tools"):
+    """按指定格式导出结果，返回写出的结果条数"""
+    if fmt == "jsonl":
+        return export_jsonl(findings, path)
+    if fmt == "csv":
+        return export_csv(findings, path)
+    if fmt == "sarif":
+        return export_sarif(findings, path, base_dir=base_dir, tool_name=tool_name)
+    raise ValueError(f"不支持的导出格式: {fmt}")
+
+
+def export_jsonl(findings, path):
+    """每行一条 JSON"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for finding in findings:
+            f.write(json.dumps(finding, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def export_csv(findings, path):
+    """CSV 格式（带 BOM，Excel 可直接打开），出现位置列表不写入
+
+    count 列只在导出聚合结果时写出；逐条导出出现位置时每行就是一次出现，不包含该列。
+    """
+    findings = iter(findings)
+    first = next(findings, None)
+    fields = CSV_FIELDS if first is not None and "count" in first else [f for f in CSV_FIELDS if f != "count"]
+    count = 0
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        if first is None:
+            return count
+        for finding in itertools.chain((first,), findings):
+            writer.writerow(finding)
+            count += 1
+    return count
+
+
+def export_sarif(findings, path, base_dir=None, tool_name="ash_tools"):
+    """SARIF 2.1.0 格式，供 CI 中的代码扫描工具读取
+
+    结果逐条写出；规则列表在写结果的过程中收集，最后写在 results 之后
+    （JSON 对象的键没有顺序要求）。位于 base_dir 下的文件使用相对路径，
+    并通过 uriBaseId 指向扫描目录。
+    """
+    rules = {}
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"$schema": %s, "version": "2.1.0", "runs": [{"results": [' % json.dumps(SARIF_SCHEMA))
+        for finding in findings:
+            rule_id = finding["type"]
+            level = SARIF_LEVELS.get(finding["severity"], "warning")
+            if rule_id not in rules:
+                rules[rule_id] = {
+                    "id": rule_id,
+                    "name": rule_id,
+                    "shortDescription": {"text": rule_id},
+                    "defaultConfiguration": {"level": level},
+                    "properties": {"severity": finding["severity"]},
+                }
+
+            locations = finding.get("occurrences") or [finding]
+            result = {
+                "ruleId": rule_id,
+                "level": level,
+                "message": {"text": f"{rule_id}: {finding['match'][:200]}"},
+                "locations": [_sarif_location(location, base_dir) for location in locations],
+            }
+            if finding.get("fingerprint"):
+                result["partialFingerprints"] = {"secretFingerprint/v1": finding["fingerprint"]}
+            if finding.get("count"):
+                result["properties"] = {"occurrences": finding["count"]}
+
+            if count:
+                f.write(', ')
+            f.write(json.dumps(result, ensure_ascii=False))
+            count += 1
+
+        tool = {"driver": {"name": tool_name, "rules": list(rules.values())}}
+        f.write('], "tool": %s' % json.dumps(tool, ensure_ascii=False))
+        if base_dir:
+            base_uri = _file_uri(os.path.abspath(base_dir)).rstrip('/') + '/'
+            f.write(', "originalUriBaseIds": %s' % json.dumps({"SRCROOT": {"uri": base_uri}}, ensure_ascii=False))
+        f.write('}]}\n')
+    return count
+
+
+def _sarif_location(location, base_dir):
+    path = location["file"]
+    artifact = {}
+    if base_dir:
+        try:
+            relative = os.path.relpath(path, base_dir) if os.path.isabs(path) else path
+        except ValueError:
+            # Windows 上文件与扫描目录不在同一个驱动器
+            relative = None
+        if relative and not relative.startswith('..'):
+            artifact = {"uri": quote(relative.replace(os.sep, '/'), safe="/!"), "uriBaseId": "SRCROOT"}
+    if not artifact:
+        artifact = {"uri": _file_uri(path)}
+
+    region = {"startLine": max(1, location.get("line") or 1)}
+    if location.get("column"):
+        region["startColumn"] = location["column"]
+    return {"physicalLocation": {"artifactLocation": artifact, "region": region}}
+
+
+def _file_uri(path):
+    path = path.replace(os.sep, '/')
+    if not path.startswith('/'):
+        path = '/' + path
+    return 'file://' + quote(path, safe="/!:")
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import uuid
+from array import array
+
+from core.utils import get_cache_dir
+
+# 保留最近若干次扫描的结果文件
+MAX_SINK_FILES = 20
+
+
+def new_sink_path(prefix="scan"):
+    """在缓存目录下生成一个新的结果文件路径，并清理过旧的结果文件
+
+    文件名带有随机后缀，同一秒内开始的多次扫描（扫描器和下载器同时运行）不会共用一个文件。
+    """
+    directory = get_cache_dir("findings")
+    prune_sinks(directory)
+    return os.path.join(directory, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.jsonl")
+
+
+def prune_sinks(directory, keep=MAX_SINK_FILES):
+    """只保留最近修改过的 keep 个结果文件（文件名前缀不同，不能按名称排序）"""
+    paths = []
+    try:
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.jsonl') and entry.is_file():
+                paths.append((entry.stat().st_mtime_ns, entry.path))
+    except OSError:
+        return
+    paths.sort()
+    for _, path in paths[:-keep] if keep else paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class FindingsSink:
+    """扫描结果的追加写入文件（每行一条 JSON）
+
+    每批结果写入后立即 flush，扫描中途停止或程序异常退出时已发现的结果不会丢失，
+    导出时也可以直接从文件流式读取，而不必把全部结果留在内存中。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        # 每个结果文件只属于一次扫描，同名的旧文件被覆盖而不是在后面追加
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, findings):
+        for finding in findings:
+            self.file.write(json.dumps(finding, ensure_ascii=False))
+            self.file.write('\n')
+        self.file.flush()
+        self.count += len(findings)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def iter_sink(path):
+    """逐条读取结果文件中的结果，忽略写入中断造成的不完整行"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class FindingsIndex:
+    """按 (规则, 密钥指纹) 聚合扫描结果
+
+    同一个密钥经常被复制到成百上千个文件中。每个唯一的密钥只保留第一次出现时的完整结果，
+    之后的出现位置以 (文件编号, 行号, 列号) 的形式存放在紧凑的整数数组里，
+    文件路径统一登记在文件表中，因此内存占用随唯一密钥的数量增长，而不是随出现次数增长。
+    分组按首次出现的顺序编号，编号一经分配不再变化。
+    """
+
+    def __init__(self):
+        self.groups = []        # 每个分组第一次出现时的完整结果
+        self.positions = []     # 每个分组的出现位置，按 文件编号, 行号, 列号 依次平铺
+        self.keys = {}          # (规则, 指纹) -> 分组编号
+        self.files = []         # 文件编号 -> 文件路径
+        self.file_ids = {}      # 文件路径 -> 文件编号
+        self.total = 0          # 全部出现次数
+
+    def __len__(self):
+        return len(self.groups)
+
+    def file_id(self, path):
+        file_id = self.file_ids.get(path)
+        if file_id is None:
+            file_id = self.file_ids[path] = len(self.files)
+            self.files.append(path)
+        return file_id
+
+    def add(self, findings):
+        """加入一批结果，返回 (新增的分组编号列表, 出现次数有变化的已有分组编号集合)"""
+        added = []
+        updated = set()
+        for finding in findings:
+            key = (finding["type"], finding.get("fingerprint") or finding["match"])
+            group = self.keys.get(key)
+            if group is None:
+                group = self.keys[key] = len(self.groups)
+                self.groups.append(finding)
+                self.positions.append(array('q'))
+                added.append(group)
+            else:
+                updated.add(group)
+            self.positions[group].extend(
+                (self.file_id(finding["file"]), finding.get("line") or 0, finding.get("column") or 0)
+            )
+            self.total += 1
+        return added, updated.difference(added)
+
+    def count(self, group):
+        """分组的出现次数"""
+        return len(self.positions[group]) // 3
+
+    def file_count(self, group):
+        """分组涉及的不同文件数"""
+        return len(set(self.positions[group][0::3]))
+
+    def iter_occurrences(self, group):
+        """依次产生分组的每个出现位置 (文件路径, 行号, 列号)"""
+        positions = self.positions[group]
+        for index in range(0, len(positions), 3):
+            yield self.files[positions[index]], positions[index + 1], positions[index + 2]
+
+    def aggregated(self, group):
+        """分组的聚合结果：第一次出现的完整结果，附带出现次数和全部出现位置"""
+        result = dict(self.groups[group])
+        result["count"] = self.count(group)
+        result["occurrences"] = [
+            {"file": path, "line": line, "column": column}
+            for path, line, column in self.iter_occurrences(group)
+        ]
+        return result
+
+    def iter_aggregated(self):
+        """按分组顺序逐个产生聚合结果"""
+        for group in range(len(self.groups)):
+            yield self.aggregated(group)
+
+    def clear(self):
+        self.__init__()
@@ -0,0 +1,447 @@
+import os
+import mmap
+import zlib
+import struct
+import threading
+from collections import OrderedDict
+
+# 直接读取 .git 目录中的对象（松散对象和 packfile），不依赖 git 命令行或第三方库
+
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+TYPE_NAMES = {b'commit': OBJ_COMMIT, b'tree': OBJ_TREE, b'blob': OBJ_BLOB, b'tag': OBJ_TAG}
+
+TREE_MODE = b'40000'
+SUBMODULE_MODE = b'160000'
+
+# delta 基础对象缓存的总字节数上限
+BASE_CACHE_SIZE = 64 * 1024 * 1024
+
+
+class GitError(Exception):
+    """git 仓库不存在或对象损坏"""
+
+
+def find_git_dir(path):
+    """返回 path 对应的 git 目录（普通仓库的 .git、工作树的 gitdir 或裸仓库本身），不是仓库时返回 None"""
+    dot_git = os.path.join(path, '.git')
+    if os.path.isdir(dot_git):
+        return dot_git
+    if os.path.isfile(dot_git):
+        # git worktree / submodule：.git 是一个内容为 "gitdir: <路径>" 的文件
+        with open(dot_git, 'r', encoding='utf-8', errors='ignore') as f:
+            line = f.readline().strip()
+        if line.startswith('gitdir:'):
+            git_dir = os.path.join(path, line[len('gitdir:'):].strip())
+            if os.path.isdir(git_dir):
+                return os.path.normpath(git_dir)
+    if os.path.isfile(os.path.join(path, 'HEAD')) and os.path.isdir(os.path.join(path, 'objects')):
+        return path
+    return None
+
+
+def apply_delta(base, delta):
+    """按 git 的 delta 格式由基础对象还原目标对象"""
+    _, pos = _delta_size(delta, 0)
+    target_size, pos = _delta_size(delta, pos)
+    out = bytearray()
+    length = len(delta)
+    while pos < length:
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            # 从基础对象复制
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset:offset + (size or 0x10000)]
+        elif op:
+            # 插入 delta 中的字面数据
+            out += delta[pos:pos + op]
+            pos += op
+        else:
+            raise GitError("delta 数据损坏")
+    if len(out) != target_size:
+        raise GitError("delta 还原后的大小不一致")
+    return bytes(out)
+
+
+def _delta_size(data, pos):
+    size = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        size |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, pos
+
+
+def parse_tree(data):
+    """依次产生树对象中的 (mode, 名称bytes, 对象id)"""
+    pos = 0
+    length = len(data)
+    while pos < length:
+        space = data.index(b' ', pos)
+        nul = data.index(b'\0', space)
+        yield data[pos:space], data[space + 1:nul], data[nul + 1:nul + 21]
+        pos = nul + 21
+
+
+def parse_commit(data):
+    """返回提交的 (树id, 父提交id列表, 提交时间戳)"""
+    tree = None
+    parents = []
+    timestamp = 0
+    for line in data.split(b'\n'):
+        if not line:
+            break
+        if line.startswith(b'tree '):
+            tree = bytes.fromhex(line[5:45].decode('ascii'))
+        elif line.startswith(b'parent '):
+            parents.append(bytes.fromhex(line[7:47].decode('ascii')))
+        elif line.startswith(b'committer '):
+            # committer 名称 <邮箱> 时间戳 时区
+            try:
+                timestamp = int(line.rsplit(b' ', 2)[-2])
+            except (ValueError, IndexError):
+                pass
+    return tree, parents, timestamp
+
+
+class PackFile:
+    """单个 packfile 及其 .idx 索引
+
+    索引以内存映射方式打开，查找对象时在扇出表限定的范围内二分查找，
+    不把全部对象 id 载入字典，对象很多的仓库也只占用很少的内存。
+    """
+
+    def __init__(self, pack_path):
+        self.pack_path = pack_path
+        idx_path = pack_path[:-5] + '.idx'
+        with open(idx_path, 'rb') as f:
+            self.idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(pack_path, 'rb') as f:
+            self.pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.idx[:4] == b'\xfftOc':
+            if struct.unpack('>I', self.idx[4:8])[0] != 2:
+                raise GitError(f"不支持的索引版本: {idx_path}")
+            self.version = 2
+            fanout_start = 8
+        else:
+            self.version = 1
+            fanout_start = 0
+        self.fanout = struct.unpack('>256I', self.idx[fanout_start:fanout_start + 1024])
+        self.count = self.fanout[255]
+        self.table_start = fanout_start + 1024
+
+    def close(self):
+        self.idx.close()
+        self.pack.close()
+
+    def _sha_at(self, index):
+        if self.version == 2:
+            start = self.table_start + 20 * index
+        else:
+            start = self.table_start + 24 * index + 4
+        return self.idx[start:start + 20]
+
+    def _offset_at(self, index):
+        if self.version == 1:
+            start = self.table_start + 24 * index
+            return struct.unpack('>I', self.idx[start:start + 4])[0]
+        start = self.table_start + 24 * self.count + 4 * index
+        offset = struct.unpack('>I', self.idx[start:start + 4])[0]
+        if offset & 0x80000000:
+            # 超过 2GB 的偏移存放在 64 位偏移表中
+            large = self.table_start + 28 * self.count + 8 * (offset & 0x7fffffff)
+            offset = struct.unpack('>Q', self.idx[large:large + 8])[0]
+        return offset
+
+    def find(self, oid):
+        """返回对象在 pack 中的偏移，不存在时返回 None"""
+        first = oid[0]
+        low = self.fanout[first - 1] if first else 0
+        high = self.fanout[first]
+        while low < high:
+            mid = (low + high) // 2
+            sha = self._sha_at(mid)
+            if sha < oid:
+                low = mid + 1
+            elif sha > oid:
+                high = mid
+            else:
+                return self._offset_at(mid)
+        return None
+
+    def read_header(self, offset):
+        """返回 (类型, 还原后大小, 数据起始偏移)"""
+        byte = self.pack[offset]
+        obj_type = (byte >> 4) & 7
+        size = byte & 0x0f
+        shift = 4
+        pos = offset + 1
+        while byte & 0x80:
+            byte = self.pack[pos]
+            pos += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+        return obj_type, size, pos
+
+    def read_ofs_delta_base(self, pos):
+        """解析 OFS_DELTA 的基础对象相对偏移，返回 (相对偏移, 数据起始偏移)"""
+        byte = self.pack[pos]
+        pos += 1
+        distance = byte & 0x7f
+        while byte & 0x80:
+            byte = self.pack[pos]
+            pos += 1
+            distance = ((distance + 1) << 7) | (byte & 0x7f)
+        return distance, pos
+
+    def inflate(self, pos, size):
+        """解压从 pos 开始的 zlib 数据流，压缩数据的长度事先未知，按块读取直到流结束"""
+        decompressor = zlib.decompressobj()
+        chunks = []
+        step = size + 1024
+        while not decompressor.eof:
+            chunk = self.pack[pos:pos + step]
+            if not chunk:
+                raise GitError(f"对象数据被截断: {self.pack_path}")
+            chunks.append(decompressor.decompress(chunk))
+            pos += step
+            step = 64 * 1024
+        return b''.join(chunks)
+
+
+def common_dir(git_dir):
+    """返回存放对象和共享引用的目录
+
+    链接工作树（git worktree add）的 gitdir 中只有 HEAD、index 等少量文件，
+    其中的 commondir 文件指向主仓库的 git 目录；普通仓库返回 git_dir 本身。
+    """
+    try:
+        with open(os.path.join(git_dir, 'commondir'), 'r', encoding='utf-8', errors='ignore') as f:
+            path = f.read().strip()
+    except OSError:
+        return git_dir
+    return os.path.normpath(os.path.join(git_dir, path)) if path else git_dir
+
+
+class GitRepository:
+    """只读访问 git 仓库中的对象
+
+    支持松散对象和 packfile（包括 OFS_DELTA / REF_DELTA 两种 delta），
+    最近还原过的 delta 基础对象保存在有大小上限的 LRU 缓存中。可以被多个线程同时读取。
+    """
+
+    def __init__(self, git_dir):
+        self.git_dir = git_dir
+        self.common_dir = common_dir(git_dir)
+        self.objects_dir = os.path.join(self.common_dir, 'objects')
+        if not os.path.isdir(self.objects_dir):
+            raise GitError(f"不是有效的 git 仓库: {git_dir}")
+
+        self.packs = []
+        pack_dir = os.path.join(self.objects_dir, 'pack')
+        if os.path.isdir(pack_dir):
+            for name in sorted(os.listdir(pack_dir)):
+                if name.endswith('.pack') and os.path.exists(os.path.join(pack_dir, name[:-5] + '.idx')):
+                    self.packs.append(PackFile(os.path.join(pack_dir, name)))
+
+        self.cache = OrderedDict()   # (pack 下标, 偏移) -> (类型, 数据)
+        self.cache_size = 0
+        self.lock = threading.Lock()
+
+    def close(self):
+        for pack in self.packs:
+            pack.close()
+        self.packs = []
+        self.cache.clear()
+
+    # ---- 对象读取 ----
+
+    def read_object(self, oid):
+        """读取对象，返回 (类型, 数据)；oid 为 20 字节的对象 id"""
+        for number, pack in enumerate(self.packs):
+            offset = pack.find(oid)
+            if offset is not None:
+                return self._read_packed(number, offset)
+
+        hex_oid = oid.hex()
+        path = os.path.join(self.objects_dir, hex_oid[:2], hex_oid[2:])
+        try:
+            with open(path, 'rb') as f:
+                raw = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            raise GitError(f"找不到对象: {hex_oid}")
+        header, _, data = raw.partition(b'\0')
+        obj_type = TYPE_NAMES.get(header.split(b' ', 1)[0])
+        if obj_type is None:
+            raise GitError(f"未知的对象类型: {hex_oid}")
+        return obj_type, data
+
+    def _read_packed(self, number, offset):
+        key = (number, offset)
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                return cached
+
+        pack = self.packs[number]
+        obj_type, size, pos = pack.read_header(offset)
+        if obj_type == OBJ_OFS_DELTA:
+            distance, pos = pack.read_ofs_delta_base(pos)
+            obj_type, base = self._read_packed(number, offset - distance)
+            data = apply_delta(base, pack.inflate(pos, size))
+        elif obj_type == OBJ_REF_DELTA:
+            base_oid = pack.pack[pos:pos + 20]
+            obj_type, base = self.read_object(base_oid)
+            data = apply_delta(base, pack.inflate(pos + 20, size))
+        elif obj_type in (OBJ_COMMIT, OBJ_TREE, OBJ_BLOB, OBJ_TAG):
+            data = pack.inflate(pos, size)
+        else:
+            raise GitError(f"未知的对象类型 {obj_type}: {pack.pack_path}@{offset}")
+
+        # 只缓存可能作为 delta 基础的对象；超过缓存上限一半的大对象不缓存
+        result = (obj_type, data)
+        if len(data) < BASE_CACHE_SIZE // 2:
+            with self.lock:
+                if key not in self.cache:
+                    self.cache[key] = result
+                    self.cache_size += len(data)
+                    while self.cache_size > BASE_CACHE_SIZE:
+                        _, (_, evicted) = self.cache.popitem(last=False)
+                        self.cache_size -= len(evicted)
+        return result
+
+    # ---- 引用和提交 ----
+
+    def ref_tips(self):
+        """返回全部引用（HEAD、分支、标签、远程分支、stash 等）指向的对象 id 集合"""
+        tips = set()
+
+        def add(value):
+            value = value.strip()
+            if len(value) == 40:
+                try:
+                    tips.add(bytes.fromhex(value))
+                except ValueError:
+                    pass
+
+        # 当前工作树和其他链接工作树的 HEAD（分离 HEAD；符号引用指向的分支在下面的 refs 中）
+        head_paths = [os.path.join(self.git_dir, 'HEAD'), os.path.join(self.common_dir, 'HEAD')]
+        worktrees_dir = os.path.join(self.common_dir, 'worktrees')
+        if os.path.isdir(worktrees_dir):
+            head_paths += [os.path.join(worktrees_dir, name, 'HEAD') for name in sorted(os.listdir(worktrees_dir))]
+        for head_path in dict.fromkeys(head_paths):
+            try:
+                with open(head_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    add(f.read())
+            except OSError:
+                pass
+
+        # 工作树自己的引用（refs/worktree、refs/bisect）和主仓库中共享的引用
+        for ref_root in dict.fromkeys((self.git_dir, self.common_dir)):
+            for root, _, files in os.walk(os.path.join(ref_root, 'refs')):
+                for name in files:
+                    try:
+                        with open(os.path.join(root, name), 'r', encoding='utf-8', errors='ignore') as f:
+                            add(f.read())
+                    except OSError:
+                        pass
+
+            try:
+                with open(os.path.join(ref_root, 'packed-refs'), 'r', encoding='utf-8', errors='ignore') as f:
+                    for line in f:
+                        if line.startswith('#'):
+                            continue
+                        add(line.lstrip('^').split(' ', 1)[0])
+            except OSError:
+                pass
+        return tips
+
+    def commits(self):
+        """从全部引用出发遍历历史，返回按提交时间从早到晚排序的 [(提交id, 树id), ...]"""
+        stack = list(self.ref_tips())
+        seen = set()
+        commits = []
+        while stack:
+            oid = stack.pop()
+            if oid in seen:
+                continue
+            seen.add(oid)
+            try:
+                obj_type, data = self.read_object(oid)
+            except GitError:
+                # 浅克隆的边界提交等缺失对象直接忽略
+                continue
+            if obj_type == OBJ_TAG:
+                # 附注标签：继续解析其指向的对象
+                if data.startswith(b'object '):
+                    stack.append(bytes.fromhex(data[7:47].decode('ascii')))
+                continue
+            if obj_type != OBJ_COMMIT:
+                continue
+            tree, parents, timestamp = parse_commit(data)
+            if tree:
+                commits.append((timestamp, len(commits), oid, tree))
+            stack.extend(parents)
+        commits.sort()
+        return [(oid, tree) for _, _, oid, tree in commits]
+
+    def iter_blobs(self, should_stop=None, accept_dir=None, accept_file=None):
+        """按提交时间顺序遍历所有提交中的文件，每个不同的 blob 只产生一次
+
+        产生 (blob id, 首次出现的提交id, 首次出现时的路径)。内容相同的树只展开一次，
+        因此未修改的目录不会在每个提交中重复遍历。
+        accept_dir(目录路径) / accept_file(文件路径) 在遍历过程中过滤路径：被过滤的目录不展开，
+        被过滤的文件不计入已产生的 blob，同样的内容之后出现在其他路径上时仍会产生。
+        """
+        should_stop = should_stop or (lambda: False)
+        accept_dir = accept_dir or (lambda path: True)
+        accept_file = accept_file or (lambda path: True)
+        seen_trees = set()
+        seen_blobs = set()
+        for commit, root in self.commits():
+            stack = [(root, '')]
+            while stack:
+                if should_stop():
+                    return
+                tree, prefix = stack.pop()
+                if tree in seen_trees:
+                    continue
+                seen_trees.add(tree)
+                try:
+                    obj_type, data = self.read_object(tree)
+                except GitError:
+                    continue
+                if obj_type != OBJ_TREE:
+                    continue
+                for mode, name, oid in parse_tree(data):
+                    path = prefix + name.decode('utf-8', errors='replace')
+                    if mode == TREE_MODE:
+                        if accept_dir(path):
+                            stack.append((oid, path + '/'))
+                    elif mode != SUBMODULE_MODE and oid not in seen_blobs and accept_file(path):
+                        seen_blobs.add(oid)
+                        yield oid, commit, path
+
+    def read_blob(self, oid):
+        obj_type, data = self.read_object(oid)
+        if obj_type != OBJ_BLOB:
+            raise GitError(f"对象不是 blob: {oid.hex()}")
+        return data
@@ -0,0 +1,94 @@
+import os
+import time
+import sqlite3
+import hashlib
+
+
+def new_content_hash():
+    """返回增量计算内容哈希的对象，结果与 scan_cache.hash_bytes 一致"""
+    return hashlib.blake2b(digest_size=20)
+
+
+class HttpCache:
+    """网站镜像的 HTTP 缓存索引
+
+    以 URL 为键，记录上次下载时响应的 ETag、Last-Modified、内容哈希以及保存到的本地文件。
+    再次下载同一站点时据此发送条件请求（If-None-Match / If-Modified-Since），
+    服务器返回 304 时不再传输响应体；服务器不支持条件请求时，内容哈希未变化的文件也不会被重写。
+
+    SQLite 连接只能在创建它的线程中使用，下载线程只在调度循环中访问缓存。
+    """
+
+    COMMIT_INTERVAL = 200
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.pending = 0
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                content_type TEXT,
+                local_path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def lookup(self, url, local_path):
+        """返回可用于条件请求的缓存条目
+
+        只有本地文件仍然存在且大小与记录一致时才返回条目（换了输出目录或文件被改动后需要完整下载），
+        否则返回 None。
+        """
+        row = self.conn.execute(
+            "SELECT etag, last_modified, content_hash, content_type, local_path, size FROM http_cache WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if not row or row[4] != local_path:
+            return None
+        try:
+            if os.path.getsize(local_path) != row[5]:
+                return None
+        except OSError:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'content_hash': row[2],
+            'content_type': row[3],
+            'local_path': row[4],
+            'size': row[5],
+        }
+
+    @staticmethod
+    def conditional_headers(entry):
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, etag, last_modified, content_hash, content_type, local_path, size):
+        """保存或更新一个 URL 的缓存记录"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content_hash, content_type, local_path, size, time.time())
+        )
+        self.pending += 1
+        if self.pending >= self.COMMIT_INTERVAL:
+            self.conn.commit()
+            self.pending = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
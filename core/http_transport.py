@@ -0,0 +1,182 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 下载器使用的 HTTP 传输层
+#
+# 默认使用 requests（HTTP/1.1，每个主机一个有界连接池）。安装了 httpx 和 h2 时可以改用 HTTP/2，
+# 同一主机的所有请求在一条连接上多路复用。安装了 brotli/brotlicffi 或 zstandard、且当前客户端
+# 支持对应的解压方式时，会在 Accept-Encoding 中声明这些压缩格式，解压由 urllib3/httpx 在读取响应体时自动完成。
+
+try:
+    import httpx
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+try:
+    import zstandard  # noqa: F401
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+def supported_encodings(http2=False):
+    """当前使用的 HTTP 客户端能够自动解压的内容编码
+
+    只安装解压库还不够：urllib3 1.x 不支持 zstd，旧版 httpx 也不支持。声明了客户端无法解压的编码时，
+    压缩的响应体会原样写入磁盘，之后的哈希、去重和扫描都会针对压缩数据进行。
+    """
+    encodings = ['gzip', 'deflate']
+    if http2:
+        # httpx 只在安装了对应的解压库时把编码加入 SUPPORTED_DECODERS
+        try:
+            from httpx._decoders import SUPPORTED_DECODERS
+        except ImportError:
+            return encodings
+        candidates = (('br', BROTLI_AVAILABLE), ('zstd', ZSTD_AVAILABLE))
+        encodings += [name for name, available in candidates if available and name in SUPPORTED_DECODERS]
+        return encodings
+
+    # urllib3 只在支持并安装了解压库时定义 BrotliDecoder / ZstdDecoder
+    try:
+        import urllib3.response
+    except ImportError:
+        return encodings
+    if BROTLI_AVAILABLE and hasattr(urllib3.response, 'BrotliDecoder'):
+        encodings.append('br')
+    if ZSTD_AVAILABLE and hasattr(urllib3.response, 'ZstdDecoder'):
+        encodings.append('zstd')
+    return encodings
+
+
+def accept_encoding(http2=False):
+    """根据当前客户端支持的解压方式生成 Accept-Encoding 请求头"""
+    return ', '.join(supported_encodings(http2))
+
+
+def create_session(headers=None, per_host_connections=6, http2=False):
+    """创建下载使用的会话，返回 (会话, 协议说明)
+
+    http2 为 True 且安装了 httpx[http2] 时返回 Http2Session，否则返回 requests.Session。
+    两者的 get() 返回的响应都支持 status_code、headers、iter_content()、raise_for_status() 和 close()。
+    """
+    headers = dict(headers or {})
+    if http2 and HTTP2_AVAILABLE:
+        headers['Accept-Encoding'] = accept_encoding(http2=True)
+        return Http2Session(headers, per_host_connections), "HTTP/2"
+
+    headers['Accept-Encoding'] = accept_encoding()
+    session = requests.Session()
+    session.headers.update(headers)
+    # 每个主机的连接池大小即为该主机的最大并发连接数，连接用完时其他请求等待而不是新建连接
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=max(1, per_host_connections), pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session, "HTTP/1.1"
+
+
+def response_protocol(response):
+    """响应实际使用的协议版本"""
+    if isinstance(response, Http2Response):
+        return response.http_version
+    version = getattr(getattr(response, 'raw', None), 'version', 11)
+    return {10: "HTTP/1.0", 11: "HTTP/1.1", 20: "HTTP/2"}.get(version, "HTTP/1.1")
+
+
+def wire_bytes(response, decoded_size):
+    """响应体在网络上传输的字节数（压缩后），无法获得时返回解码后的大小"""
+    if isinstance(response, Http2Response):
+        return response.response.num_bytes_downloaded
+    raw = getattr(response, 'raw', None)
+    try:
+        return raw.tell()
+    except Exception:
+        return decoded_size
+
+
+class Http2Response:
+    """把 httpx 的流式响应包装成下载器使用的 requests 风格接口"""
+
+    def __init__(self, response):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.http_version = response.http_version
+
+    def iter_content(self, chunk_size=8192):
+        return self.response.iter_bytes(chunk_size)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.response.url}", response=self)
+
+    def close(self):
+        self.response.close()
+
+
+class Http2Session:
+    """基于 httpx 的 HTTP/2 会话，同一主机的请求在一条连接上多路复用
+
+    不支持 HTTP/2 的服务器会自动协商回 HTTP/1.1。httpx.Client 可以被多个线程共享。
+    """
+
+    def __init__(self, headers, max_connections=6):
+        self.client = httpx.Client(
+            http2=True,
+            headers=headers,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max(1, max_connections) * 4, max_keepalive_connections=max(1, max_connections)),
+        )
+
+    def get(self, url, stream=False, timeout=None, headers=None):
+        request = self.client.build_request("GET", url, headers=headers, timeout=timeout)
+        response = self.client.send(request, stream=True)
+        if not stream:
+            response.read()
+        return Http2Response(response)
+
+    def close(self):
+        self.client.close()
+
+
+class TransportStats:
+    """按协议统计请求数、网络传输字节数、解码后字节数和耗时（线程安全）
+
+    耗时是各个请求从发出到读完响应体的时间之和，throughput 因此是单个请求的平均传输速度。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.protocols = {}
+
+    def record(self, protocol, wire_size, decoded_size, elapsed):
+        with self.lock:
+            stats = self.protocols.setdefault(protocol, {"requests": 0, "wire_bytes": 0, "bytes": 0, "seconds": 0.0})
+            stats["requests"] += 1
+            stats["wire_bytes"] += wire_size
+            stats["bytes"] += decoded_size
+            stats["seconds"] += elapsed
+
+    def summary(self):
+        """返回 {协议: 统计} 的副本，附带每秒传输字节数和压缩比"""
+        with self.lock:
+            result = {}
+            for protocol, stats in self.protocols.items():
+                stats = dict(stats)
+                stats["throughput"] = stats["wire_bytes"] / stats["seconds"] if stats["seconds"] else 0.0
+                stats["ratio"] = stats["wire_bytes"] / stats["bytes"] if stats["bytes"] else 1.0
+                result[protocol] = stats
+            return result
@@ -0,0 +1,209 @@
+import re
+import codecs
+import html
+import urllib.parse
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# 从已下载到内存中的页面提取链接：优先使用 lxml（C 实现），未安装时使用基于正则的标签扫描器
+
+# 需要提取链接的标签及其属性
+LINK_ATTRIBUTES = {
+    'a': 'href',
+    'link': 'href',
+    'script': 'src',
+    'img': 'src',
+    'source': 'src',
+    'iframe': 'src',
+}
+
+_CHARSET_HEADER = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_CHARSET_META = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+_COMMENT = re.compile(r'<!--.*?-->', re.S)
+# 一次匹配出标签和所需的属性：a/link/base 取 href，其余标签取 src
+_LINK = re.compile(
+    r'''<(?:(a|link|base)|script|img|source|iframe)\b[^>]*?\s(?(1)href|src)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''',
+    re.I
+)
+
+
+# CSS：url(...) 和 @import "..."
+_CSS_URL = re.compile(r'''url\(\s*(?:"([^"]*)"|'([^']*)'|([^)"'\s]+))\s*\)|@import\s+(?:"([^"]*)"|'([^']*)')''', re.I)
+
+# JS / CSS 中的 sourcemap 注释
+_SOURCE_MAP = re.compile(r'''[#@]\s*sourceMappingURL\s*=\s*([^\s'"*]+)''')
+
+# 动态 import()、静态 import/export ... from、new Worker/URL(...) 中的模块路径
+_JS_IMPORT = re.compile(
+    r'''(?:\bimport\s*\(\s*|\bfrom\s*|\bimport\s+|new\s+(?:Worker|SharedWorker|URL)\s*\(\s*)(["'`])([^"'`\s]+)\1'''
+)
+
+# 字符串字面量中形如资源路径的值（打包产物中的 chunk、样式和 sourcemap 列表，如 Vite 的 __vite__mapDeps）
+_JS_ASSET_LITERAL = re.compile(
+    r'''(["'`])((?:\.{0,2}/)?(?:[\w@.~-]+/)*[\w@~-][\w@.~-]*\.(?:m?js|css|map|json|wasm))\1'''
+)
+
+# webpack 运行时的 chunk 文件名函数："static/js/" + e + "." + {12:"ab12",...}[e] + ".chunk.js"
+_WEBPACK_CHUNK_MAP = re.compile(
+    r'''(["'])([^"'\s]*)\1\s*\+\s*\(?\s*(\w+)\s*\)?\s*\+\s*(["'])([^"'\s]*)\4\s*\+\s*\{([^{}]*)\}\s*\[\s*\3\s*\]\s*\+\s*(["'])([^"'\s]*)\7'''
+)
+_WEBPACK_MAP_ENTRY = re.compile(r'''(?:"([^"]+)"|'([^']+)'|([\w$]+))\s*:\s*["']([^"']+)["']''')
+# webpack 的 publicPath：__webpack_require__.p = "/static/"
+_WEBPACK_PUBLIC_PATH = re.compile(r'''\.p\s*=\s*["']([^"']*)["']''')
+
+
+def detect_charset(body, content_type=''):
+    """按 BOM、Content-Type 头、<meta charset> 的顺序确定编码，均未声明时使用 utf-8"""
+    for bom, encoding in _BOMS:
+        if body.startswith(bom):
+            return encoding
+    candidates = []
+    match = _CHARSET_HEADER.search(content_type or '')
+    if match:
+        candidates.append(match.group(1))
+    match = _CHARSET_META.search(body[:4096])
+    if match:
+        candidates.append(match.group(1).decode('ascii', errors='ignore'))
+    for candidate in candidates:
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return 'utf-8'
+
+
+def decode_body(body, content_type=''):
+    """按响应声明的编码解码，无法解码的字节替换为占位符"""
+    return body.decode(detect_charset(body, content_type), errors='replace')
+
+
+def extract_html_links(text, base_url):
+    """提取页面中的链接，返回去掉片段标识的绝对 URL 列表（保持出现顺序，已去重）
+
+    页面中的 <base href> 会改变相对链接的基准地址。
+    """
+    raw_links = _lxml_links(text) if LXML_AVAILABLE else None
+    if raw_links is None:
+        raw_links = _scan_links(text)
+
+    links = []
+    seen = set()
+    for tag, value in raw_links:
+        value = value.strip()
+        if not value:
+            continue
+        if tag == 'base':
+            base_url = _join(base_url, value) or base_url
+            continue
+        url = _join(base_url, value)
+        if url and url not in seen:
+            seen.add(url)
+            links.append(url)
+    return links
+
+
+def _lxml_links(text):
+    """使用 lxml 解析，返回 [(标签, 属性值)]；解析失败时返回 None 交给扫描器处理"""
+    try:
+        parser = etree.HTMLParser(encoding='utf-8', recover=True, no_network=True)
+        root = etree.fromstring(text.encode('utf-8'), parser)
+    except (etree.LxmlError, ValueError):
+        return None
+    if root is None:
+        return []
+
+    links = []
+    for element in root.iter('base', *LINK_ATTRIBUTES):
+        value = element.get('href' if element.tag == 'base' else LINK_ATTRIBUTES[element.tag])
+        if value:
+            links.append((element.tag, value))
+    return links
+
+
+def _scan_links(text):
+    """基于正则的标签扫描器，只查找需要的标签和属性，跳过注释"""
+    links = []
+    for match in _LINK.finditer(_COMMENT.sub('', text)):
+        tag = (match.group(1) or 'src').lower()
+        value = next(group for group in match.groups()[1:] if group is not None)
+        links.append((tag, html.unescape(value)))
+    return links
+
+
+def extract_css_links(text, base_url):
+    """提取样式表中 url() 和 @import 引用的资源，以及 sourcemap"""
+    values = [next(group for group in match.groups() if group is not None) for match in _CSS_URL.finditer(text)]
+    values.extend(match.group(1) for match in _SOURCE_MAP.finditer(text))
+    return _resolve(values, base_url)
+
+
+def extract_js_links(text, base_url):
+    """提取脚本中引用的其他脚本、chunk、样式和 sourcemap
+
+    包括动态 import()、静态 import/export from、Worker 脚本、webpack 的 chunk 文件名映射表、
+    字符串中形如资源路径的值和 sourceMappingURL 注释。只做文本扫描，不执行脚本。
+    """
+    # 裸模块名（import React from "react"）由打包工具解析，不是可下载的地址
+    values = [
+        match.group(2) for match in _JS_IMPORT.finditer(text)
+        if match.group(2).startswith(('./', '../', '/', 'http://', 'https://'))
+    ]
+    values.extend(match.group(1) for match in _SOURCE_MAP.finditer(text))
+
+    # 打包产物中不以 ./、../、/ 开头的资源路径相对 publicPath（未声明时为站点根目录），
+    # 其余按脚本自身的地址解析
+    public_path = _WEBPACK_PUBLIC_PATH.search(text)
+    chunk_base = _join(base_url, public_path.group(1) if public_path else '/') or _join(base_url, '/')
+    chunks = []
+    for match in _JS_ASSET_LITERAL.finditer(text):
+        value = match.group(2)
+        if value.startswith(('./', '../', '/')):
+            values.append(value)
+        else:
+            chunks.append(value)
+
+    links = _resolve(values, base_url)
+    for match in _WEBPACK_CHUNK_MAP.finditer(text):
+        prefix, separator, suffix = match.group(2), match.group(5), match.group(8)
+        for entry in _WEBPACK_MAP_ENTRY.finditer(match.group(6)):
+            chunk_id = next(group for group in entry.groups()[:3] if group is not None)
+            chunks.append(f"{prefix}{chunk_id}{separator}{entry.group(4)}{suffix}")
+    seen = set(links)
+    for url in _resolve(chunks, chunk_base):
+        if url not in seen:
+            seen.add(url)
+            links.append(url)
+    return links
+
+
+def _join(base_url, value):
+    """把相对地址解析为去掉片段的绝对 URL，地址无法解析（例如 IPv6 主机缺少方括号）时返回 None"""
+    try:
+        return urllib.parse.urldefrag(urllib.parse.urljoin(base_url, value))[0]
+    except ValueError:
+        return None
+
+
+def _resolve(values, base_url):
+    """把相对地址解析为绝对 URL，跳过 data:/blob:/javascript: 等非网络地址、模板变量和无法解析的地址"""
+    links = []
+    seen = set()
+    for value in values:
+        value = value.strip()
+        if not value or value.startswith(('data:', 'blob:', 'javascript:', 'about:', '#')) or '${' in value:
+            continue
+        url = _join(base_url, value)
+        if url and url not in seen:
+            seen.add(url)
+            links.append(url)
+    return links
@@ -0,0 +1,243 @@
+import os
+import re
+import json
+import hashlib
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+from core.utils import get_cache_dir
+from core.validators import VALIDATORS
+
+# 编译器逻辑变化时递增，使旧的编译缓存失效
+COMPILER_VERSION = 2
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+# 自动推导的锚点最少字符数，过短的字面量起不到预过滤作用
+MIN_ANCHOR_LENGTH = 3
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+
+class RulePackError(Exception):
+    """规则包无法读取或格式错误"""
+
+
+def parse_rule_pack(path, raw):
+    """解析规则包内容（按扩展名区分 YAML 或 JSON），返回原始规则列表
+
+    支持两种结构：顶层直接是规则列表，或 {"name": ..., "rules": [...]}。
+    每条规则至少包含 name 和 pattern，可选 severity、anchors、validators、min_entropy、enabled。
+    """
+    text = raw.decode('utf-8-sig')
+    if path.lower().endswith(('.yml', '.yaml')):
+        if not YAML_AVAILABLE:
+            raise RulePackError("读取 YAML 规则包需要安装 PyYAML")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise RulePackError(f"YAML 格式错误: {e}")
+    else:
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise RulePackError(f"JSON 格式错误: {e}")
+
+    if isinstance(data, dict):
+        data = data.get("rules")
+    if not isinstance(data, list):
+        raise RulePackError("规则包中没有找到规则列表")
+    return data
+
+
+def compile_rules(raw_rules, source="builtin"):
+    """校验、去重并分析规则，返回 (规则列表, 警告列表)
+
+    - 缺少字段、严重性非法或正则无法编译的规则会被丢弃
+    - 与已有规则正则完全相同的规则视为重复，只保留第一条
+    - 含有嵌套无界量词（如 (a+)+）、可能导致灾难性回溯的规则会被丢弃
+    - 未声明 anchors 的规则自动从正则中推导必需的字面量作为锚点
+    """
+    rules = []
+    warnings = []
+    seen = set()
+
+    for index, raw in enumerate(raw_rules):
+        label = f"{source} #{index + 1}"
+        if not isinstance(raw, dict):
+            warnings.append(f"{label}: 规则必须是对象")
+            continue
+        if raw.get("enabled", True) is False:
+            continue
+
+        name = raw.get("name")
+        pattern = raw.get("pattern")
+        if not isinstance(name, str) or not name or not isinstance(pattern, str) or not pattern:
+            warnings.append(f"{label}: 缺少 name 或 pattern")
+            continue
+        label = f"{source} #{index + 1} ({name})"
+
+        severity = str(raw.get("severity", "medium")).lower()
+        if severity not in SEVERITIES:
+            warnings.append(f"{label}: 未知的严重性 {severity}")
+            continue
+
+        if pattern in seen:
+            warnings.append(f"{label}: 与已有规则重复，已忽略")
+            continue
+
+        try:
+            parsed = sre_parse.parse(pattern)
+            re.compile(pattern)
+            re.compile(pattern.encode('utf-8'))
+        except (re.error, UnicodeEncodeError) as e:
+            warnings.append(f"{label}: 正则无法编译 - {e}")
+            continue
+
+        if has_nested_quantifier(parsed.data):
+            warnings.append(f"{label}: 存在嵌套的无界量词，可能导致灾难性回溯，已忽略")
+            continue
+
+        anchors = raw.get("anchors")
+        if anchors is not None:
+            if not isinstance(anchors, list) or not all(isinstance(a, str) and a for a in anchors):
+                warnings.append(f"{label}: anchors 必须是非空字符串列表")
+                continue
+        else:
+            anchors = derive_anchors(parsed.data)
+
+        validators = raw.get("validators")
+        if validators is not None:
+            if not isinstance(validators, list) or not all(v in VALIDATORS for v in validators):
+                warnings.append(f"{label}: validators 只能包含 {', '.join(VALIDATORS)}")
+                continue
+
+        min_entropy = raw.get("min_entropy")
+        if min_entropy is not None and (isinstance(min_entropy, bool) or not isinstance(min_entropy, (int, float))):
+            warnings.append(f"{label}: min_entropy 必须是数字")
+            continue
+
+        seen.add(pattern)
+        rule = {"name": name, "pattern": pattern, "severity": severity}
+        if anchors:
+            rule["anchors"] = anchors
+        if validators:
+            rule["validators"] = validators
+        if min_entropy:
+            rule["min_entropy"] = min_entropy
+        rules.append(rule)
+
+    return rules, warnings
+
+
+def compile_rule_pack(path, cache_dir=None):
+    """编译规则包并以内容哈希为键缓存编译结果，规则包不变时直接读取缓存
+
+    返回 (规则列表, 警告列表)。
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    digest = hashlib.sha256(raw + f":{COMPILER_VERSION}".encode('ascii')).hexdigest()
+    cache_file = os.path.join(cache_dir or get_cache_dir("rules"), f"{digest}.json")
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached["rules"], cached["warnings"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    rules, warnings = compile_rules(parse_rule_pack(path, raw), source=os.path.basename(path))
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({"rules": rules, "warnings": warnings}, f, ensure_ascii=False)
+    except OSError:
+        pass
+    return rules, warnings
+
+
+def has_nested_quantifier(items, in_unbounded=False):
+    """检测无界量词内部是否还嵌套着无界量词，例如 (a+)+、(\\w*\\s?)*"""
+    for op, value in items:
+        if op in _REPEATS:
+            low, high, sub = value
+            unbounded = high == sre_parse.MAXREPEAT
+            if unbounded and in_unbounded:
+                return True
+            if has_nested_quantifier(sub, in_unbounded or unbounded):
+                return True
+        elif op is sre_parse.SUBPATTERN:
+            if has_nested_quantifier(value[-1], in_unbounded):
+                return True
+        elif op is sre_parse.BRANCH:
+            if any(has_nested_quantifier(branch, in_unbounded) for branch in value[1]):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if has_nested_quantifier(value[1], in_unbounded):
+                return True
+    return False
+
+
+def derive_anchors(items):
+    """从解析后的正则中推导必需的字面量锚点
+
+    返回一组字面量（小写），任意匹配都至少包含其中之一；无法推导时返回 None。
+    """
+    candidates = _required_literals(items)
+    return _best(candidates)
+
+
+def _best(candidates):
+    """在多个候选锚点组中选择最短锚点最长的一组"""
+    best = None
+    for group in candidates:
+        if not group or min(len(a) for a in group) < MIN_ANCHOR_LENGTH:
+            continue
+        if best is None or min(len(a) for a in group) > min(len(a) for a in best):
+            best = group
+    return sorted(set(best)) if best else None
+
+
+def _required_literals(items, prefix=''):
+    """返回候选锚点组列表，每一组表示“匹配必然包含组内某个字面量”
+
+    prefix 为紧挨在前面的字面量，会拼接到开头的字面量上
+    （解析器会把 password|pwd 的公共前缀提取为 p(?:assword|wd)）。
+    """
+    candidates = []
+    run = list(prefix)
+
+    def flush():
+        if run:
+            candidates.append([''.join(run).lower()])
+            run.clear()
+
+    for op, value in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(value))
+            continue
+        prefix = ''.join(run)
+        flush()
+        if op is sre_parse.SUBPATTERN:
+            group = _best(_required_literals(value[-1]))
+            if group:
+                candidates.append(group)
+        elif op is sre_parse.BRANCH:
+            groups = [_best(_required_literals(branch, prefix)) for branch in value[1]]
+            if all(groups):
+                candidates.append([anchor for group in groups for anchor in group])
+        elif op in _REPEATS and value[0] >= 1:
+            group = _best(_required_literals(value[2]))
+            if group:
+                candidates.append(group)
+    flush()
+    return candidates
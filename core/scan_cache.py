@@ -0,0 +1,118 @@
+import json
+import sqlite3
+import hashlib
+
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """分块计算文件内容的哈希，避免一次性读入大文件"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_bytes(data):
+    """计算内存中内容的哈希，与 hash_file 的结果一致"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class ScanCache:
+    """敏感信息扫描的持久化指纹缓存
+
+    以文件路径为键，记录 (大小, 修改时间, 内容哈希, 规则集版本) 以及该文件的扫描结果。
+    大小和修改时间都未变化时直接复用结果，无需读取文件；
+    修改时间变化但内容哈希相同（例如重新解包、touch）时同样复用结果。
+    其他路径上内容相同的文件（例如镜像中指向同一存储对象的硬链接）的结果也会被复用，
+    只替换其中的文件路径。
+    规则集版本变化后所有缓存条目自动失效。
+
+    SQLite 连接只能在创建它的线程中使用，因此应在扫描线程的 run() 中创建。
+    """
+
+    COMMIT_INTERVAL = 500
+
+    def __init__(self, db_path, pattern_version):
+        self.db_path = db_path
+        self.pattern_version = pattern_version
+        self.pending = 0
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS file_cache (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                pattern_version TEXT NOT NULL,
+                findings TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS file_cache_hash ON file_cache (content_hash)")
+        self.conn.commit()
+
+    def get(self, path):
+        """返回缓存条目 (size, mtime_ns, content_hash, findings_json)，规则集版本不符时返回 None"""
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, content_hash, pattern_version, findings FROM file_cache WHERE path = ?",
+            (path,)
+        ).fetchone()
+        if not row or row[3] != self.pattern_version:
+            return None
+        return row[0], row[1], row[2], row[4]
+
+    def lookup(self, path, size, mtime_ns):
+        """大小和修改时间均未变化时返回缓存的扫描结果，否则返回 None"""
+        entry = self.get(path)
+        if entry and entry[0] == size and entry[1] == mtime_ns:
+            return json.loads(entry[3])
+        return None
+
+    def lookup_hash(self, path, content_hash, size, mtime_ns):
+        """内容哈希未变化时返回缓存的扫描结果，并刷新记录的大小和修改时间"""
+        entry = self.get(path)
+        if not entry or entry[2] != content_hash:
+            return None
+        self.conn.execute(
+            "UPDATE file_cache SET size = ?, mtime_ns = ? WHERE path = ?",
+            (size, mtime_ns, path)
+        )
+        self._mark_dirty()
+        return json.loads(entry[3])
+
+    def lookup_content(self, path, content_hash, size, mtime_ns):
+        """查找其他路径上内容相同且规则集版本一致的文件，复用其结果并为当前路径建立缓存条目"""
+        row = self.conn.execute(
+            "SELECT path, findings FROM file_cache WHERE content_hash = ? AND pattern_version = ? AND path != ? LIMIT 1",
+            (content_hash, self.pattern_version, path)
+        ).fetchone()
+        if not row:
+            return None
+        source_path = row[0]
+        findings = json.loads(row[1])
+        for finding in findings:
+            # 压缩包成员的路径形如 <文件>!/<成员>，只替换前面的文件部分
+            if finding.get("file", "").startswith(source_path):
+                finding["file"] = path + finding["file"][len(source_path):]
+        self.store(path, size, mtime_ns, content_hash, findings)
+        return findings
+
+    def store(self, path, size, mtime_ns, content_hash, findings):
+        """保存单个文件的扫描结果"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO file_cache VALUES (?, ?, ?, ?, ?, ?)",
+            (path, size, mtime_ns, content_hash, self.pattern_version,
+             json.dumps(findings, ensure_ascii=False))
+        )
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        self.pending += 1
+        if self.pending >= self.COMMIT_INTERVAL:
+            self.conn.commit()
+            self.pending = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from core.content_sniffer import SNIFF_SIZE, decode_text, is_binary
+from core.sensitive_engine import SensitivePatternEngine
+from core.sensitive_rules import default_patterns
+
+# 下载与敏感信息扫描的流水线：下载线程把已在内存中的响应体交给扫描线程池，
+# 边下载边产生结果，不必等镜像完成后再由扫描器从磁盘把所有文件重新读一遍。
+
+
+class ScanPipeline:
+    """在线程池中扫描内存中的文件内容
+
+    submit 和 drain 只在同一个调度线程中调用：submit 提交一个文件，drain 取回已经完成的结果。
+    内容哈希相同的文件（同一个脚本的多个 URL、重复下载）只扫描一次，
+    其余文件复用结果并替换文件路径。扫描不占用下载线程；正则匹配时不会释放 GIL，
+    多开扫描线程并不能让匹配并行，默认 2 个线程用于让扫描与网络等待重叠。
+    """
+
+    def __init__(self, patterns=None, workers=2):
+        self.engine = SensitivePatternEngine(patterns or default_patterns())
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.pending = []       # (future, 文件路径, 附加字段, 内容哈希)，future 为 None 表示复用已有结果
+        self.scanned = {}       # 内容哈希 -> 扫描时使用的文件路径
+        self.waiting = {}       # 内容哈希 -> 等待同一内容扫描完成的 [(文件路径, 附加字段)]
+        self.results = {}       # 内容哈希 -> 结果列表（只保存有结果的内容）
+        # 计数只在调度线程的 drain 中更新，扫描线程不修改共享状态
+        self.scanned_files = 0
+        self.skipped_binary = 0
+
+    def submit(self, file_path, data, content_hash=None, extra=None):
+        """提交一个文件的内容；extra 中的字段会加入该文件的每条结果（例如来源 URL）"""
+        if content_hash is not None and content_hash in self.scanned:
+            if content_hash in self.waiting:
+                self.waiting[content_hash].append((file_path, extra))
+            else:
+                self.pending.append((None, file_path, extra, content_hash))
+            return
+        if content_hash is not None:
+            self.scanned[content_hash] = file_path
+            self.waiting[content_hash] = []
+        future = self.pool.submit(self._scan, file_path, data)
+        self.pending.append((future, file_path, extra, content_hash))
+
+    def drain(self, wait=False):
+        """返回已完成文件的结果列表；wait 为 True 时等待全部提交的文件扫描完成"""
+        findings = []
+        remaining = []
+        for future, file_path, extra, content_hash in self.pending:
+            if future is None:
+                # 内容已扫描过，直接复用结果
+                findings.extend(self._reuse(content_hash, file_path, extra))
+                continue
+            if not wait and not future.done():
+                remaining.append((future, file_path, extra, content_hash))
+                continue
+            try:
+                binary, results = future.result()
+            except Exception:
+                binary, results = False, []
+            if binary:
+                self.skipped_binary += 1
+            else:
+                self.scanned_files += 1
+            for result in results:
+                if extra:
+                    result.update(extra)
+            findings.extend(results)
+            if content_hash is not None:
+                if results:
+                    self.results[content_hash] = results
+                for waiting_path, waiting_extra in self.waiting.pop(content_hash, ()):
+                    findings.extend(self._reuse(content_hash, waiting_path, waiting_extra))
+        self.pending = remaining
+        return findings
+
+    def close(self, wait=True):
+        """结束流水线，wait 为 False 时丢弃尚未开始的扫描"""
+        if not wait:
+            # shutdown 的 cancel_futures 参数需要 Python 3.9
+            for future, _, _, _ in self.pending:
+                if future is not None:
+                    future.cancel()
+        self.pool.shutdown(wait=wait)
+
+    def _reuse(self, content_hash, file_path, extra):
+        findings = []
+        for result in self.results.get(content_hash, ()):
+            result = dict(result, file=file_path)
+            if extra:
+                result.update(extra)
+            findings.append(result)
+        return findings
+
+    def _scan(self, file_path, data):
+        """在扫描线程中执行，返回 (是否为二进制文件, 结果列表)"""
+        if is_binary(data[:SNIFF_SIZE]):
+            return True, []
+        return False, list(self.engine.iter_findings(file_path, decode_text(data)))
@@ -0,0 +1,186 @@
+import re
+import json
+import bisect
+import hashlib
+
+from core.validators import validate_values
+
+# 分块扫描时每个窗口的大小，以及相邻窗口之间的重叠字节数
+# （重叠部分需大于单条匹配的最大长度，保证跨窗口的匹配不会被截断）
+CHUNK_SIZE = 8 * 1024 * 1024
+CHUNK_OVERLAP = 4096
+
+NEWLINE_BYTES = re.compile(b'\n')
+NEWLINE = re.compile('\n')
+
+# 结果中保存的匹配内容的最大长度（指纹按完整的匹配计算）
+MAX_MATCH_LENGTH = 256
+
+# 扫描结果的字段或判定方式（校验、解码）变化时递增，使缓存中的旧结果失效
+RESULT_VERSION = 5
+
+# 这些校验器对应的值只比较其中的数字（忽略空格、横线等分隔符的差异）
+DIGIT_VALIDATORS = {'luhn', 'ssn', 'phone'}
+
+_NON_DIGIT = re.compile(r'\D')
+
+
+class SensitivePatternEngine:
+    """预编译的敏感信息匹配引擎
+
+    每条正则只在第一次需要时编译一次并保存下来。每条规则可以声明若干字面量锚点（anchors），
+    扫描前先在内容中查找这些锚点，只有锚点命中的规则才会执行完整的正则匹配。
+    相同的锚点只检查一次，由共享该锚点的规则组共同使用。
+
+    每条规则有 str 和 bytes 两个版本，bytes 版本用于大文件的分块扫描。
+    延迟编译使得规则数量很多时构造引擎依然很快，锚点从未命中的规则也不会被编译。
+    """
+
+    def __init__(self, patterns):
+        self.patterns = []
+        self.anchor_groups = {}        # 锚点 -> 使用该锚点的规则下标列表
+        self.byte_anchor_groups = {}   # 同上，bytes 版本
+        self.always_run = []           # 没有锚点、每个文件都要执行的规则下标
+
+        # 规则集版本，规则内容变化时随之变化（用于扫描结果缓存失效）
+        signature = json.dumps([RESULT_VERSION] + [
+            [p["name"], p["pattern"], p["severity"], p.get("validators"), p.get("min_entropy")]
+            for p in patterns
+        ])
+        self.version = hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+        for index, pattern in enumerate(patterns):
+            self.patterns.append(dict(pattern))
+
+            anchors = pattern.get("anchors")
+            if not anchors:
+                self.always_run.append(index)
+                continue
+            for anchor in anchors:
+                anchor = anchor.lower()
+                self.anchor_groups.setdefault(anchor, []).append(index)
+                self.byte_anchor_groups.setdefault(anchor.encode('utf-8'), []).append(index)
+
+    def active_patterns(self, content):
+        """返回锚点命中、需要在该内容上执行的规则列表（保持原始顺序）"""
+        if isinstance(content, (bytes, bytearray)):
+            groups, key = self.byte_anchor_groups, "bytes_regex"
+        else:
+            groups, key = self.anchor_groups, "regex"
+
+        lowered = content.lower()
+        active = set(self.always_run)
+        for anchor, indexes in groups.items():
+            if anchor in lowered:
+                active.update(indexes)
+
+        patterns = [self.patterns[index] for index in sorted(active)]
+        for pattern in patterns:
+            if key not in pattern:
+                source = pattern["pattern"]
+                pattern[key] = re.compile(source.encode('utf-8') if key == "bytes_regex" else source)
+        return patterns
+
+    def iter_matches(self, content):
+        """依次产生通过校验的 (规则, 匹配对象)"""
+        for pattern in self.active_patterns(content):
+            matches = list(pattern["regex"].finditer(content))
+            for match in self.filter_matches(pattern, matches):
+                yield pattern, match
+
+    def iter_findings(self, file_path, content, max_match_length=MAX_MATCH_LENGTH):
+        """在已解码的文本上匹配，依次产生结果字典（行号和列号均从 1 开始）
+
+        结果只记录位置，上下文在显示或导出时再从源文件中取回。
+        """
+        # 换行符偏移索引，每个文件只构建一次
+        line_starts = None
+        for pattern, match in self.iter_matches(content):
+            if line_starts is None:
+                line_starts = [0] + [newline.end() for newline in NEWLINE.finditer(content)]
+            index = bisect.bisect_right(line_starts, match.start()) - 1
+            yield {
+                "file": file_path,
+                "type": pattern["name"],
+                "severity": pattern["severity"],
+                "match": match.group(0)[:max_match_length],
+                "line": index + 1,
+                "column": match.start() - line_starts[index] + 1,
+                "fingerprint": secret_fingerprint(pattern, match)
+            }
+
+    def filter_matches(self, pattern, matches):
+        """第二阶段校验：对同一规则的一批匹配统一执行规则声明的校验器
+
+        validators 为校验器名称列表（luhn/ssn/phone/placeholder），min_entropy 为
+        密钥值的最小香农熵；校验对象是第一个捕获组（没有时为整个匹配）。
+        """
+        validators = pattern.get("validators")
+        min_entropy = pattern.get("min_entropy")
+        if not matches or not (validators or min_entropy):
+            return matches
+
+        values = [secret_value(match) for match in matches]
+        verdicts = validate_values(values, validators, min_entropy)
+        return [match for match, ok in zip(matches, verdicts) if ok]
+
+    def iter_buffer_matches(self, buffer, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+        """在 bytes 或 mmap 上按重叠窗口分块扫描
+
+        依次产生 (规则, 匹配对象, 行号, 列号)，匹配对象的位置是相对整个
+        buffer 的绝对偏移。内存占用只与窗口大小有关，与文件大小无关。
+        """
+        total = len(buffer)
+        offset = 0
+        line_base = 1         # 当前窗口起点所在的行号
+        line_start = 0        # 当前窗口起点所在行的起始偏移
+        last_end = {}   # 规则正则 -> 已报告匹配的结束位置
+
+        while offset < total:
+            accept_end = min(offset + chunk_size, total)
+            window_end = min(accept_end + overlap, total)
+            window = buffer[offset:window_end]
+            line_starts = [line_start] + [offset + match.end() for match in NEWLINE_BYTES.finditer(window)]
+
+            for pattern in self.active_patterns(window):
+                key = pattern["pattern"]
+                # 从上一个窗口最后一条匹配的结束处继续，避免重叠区产生重复或错位的匹配
+                start = max(offset, last_end.get(key, 0))
+                matches = []
+                for match in pattern["bytes_regex"].finditer(buffer, start, window_end):
+                    # 起点落在重叠区的匹配留给下一个窗口处理
+                    if match.start() >= accept_end:
+                        break
+                    last_end[key] = match.end()
+                    matches.append(match)
+
+                for match in self.filter_matches(pattern, matches):
+                    index = bisect.bisect_right(line_starts, match.start()) - 1
+                    yield pattern, match, line_base + index, match.start() - line_starts[index] + 1
+
+            accepted = accept_end - offset
+            line_base += window.count(b'\n', 0, accepted)
+            last_newline = window.rfind(b'\n', 0, accepted)
+            if last_newline != -1:
+                line_start = offset + last_newline + 1
+            offset = accept_end
+
+
+def secret_value(match):
+    """取匹配中的密钥值：第一个捕获组，没有捕获组时为整个匹配"""
+    value = match.group(1) if match.re.groups and match.group(1) is not None else match.group(0)
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', errors='ignore')
+    return value
+
+
+def secret_fingerprint(pattern, match):
+    """计算匹配的密钥指纹，同一规则下规范化后相同的密钥得到相同的指纹
+
+    规范化时去掉首尾的空白和引号；卡号、身份证号、电话等只保留数字。
+    """
+    value = secret_value(match).strip().strip('\'"`').strip()
+    if DIGIT_VALIDATORS.intersection(pattern.get("validators") or ()):
+        value = _NON_DIGIT.sub('', value)
+    key = f"{pattern['name']}\0{value}".encode('utf-8', errors='ignore')
+    return hashlib.blake2b(key, digest_size=8).hexdigest()
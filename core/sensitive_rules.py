@@ -0,0 +1,63 @@
+# 内置的敏感信息规则
+#
+# anchors 为规则必然包含的字面量（不区分大小写），用于扫描前的快速预过滤；
+# 未声明 anchors 的规则对每个文件都会执行。
+# validators / min_entropy 为命中后的第二阶段校验，用于过滤随机数字、占位符等误报。
+
+
+def default_patterns():
+    """返回内置规则列表（每次调用返回新的列表，调用方可以自由修改）"""
+    return [
+        # API密钥和令牌 - 增加上下文要求
+        {"name": "API Key", "pattern": r'(?i)(?:api[_-]?key|access[_-]?key|secret[_-]?key)[\s=:]+["\']([0-9a-zA-Z\-_]{10,50})["\']', "severity": "high", "anchors": ["key"], "validators": ["placeholder"]},
+        {"name": "App Secret", "pattern": r'(?i)(?:app[_-]?secret|client[_-]?secret)[\s=:]+["\']([0-9a-zA-Z\-_]{10,50})["\']', "severity": "critical", "anchors": ["secret"], "validators": ["placeholder"]},
+        {"name": "Bearer Token", "pattern": r'(?i)bearer[\s]+([a-zA-Z0-9\-_]{20,100})', "severity": "critical", "anchors": ["bearer"], "validators": ["placeholder"]},
+        {"name": "JWT Token", "pattern": r'\beyJ[A-Za-z0-9-_=]+\.[A-Za-z0-9-_=]+\.?[A-Za-z0-9-_.+/=]*\b', "severity": "high", "anchors": ["eyJ"]},
+        
+        # 密码 - 增加上下文要求
+        {"name": "Password", "pattern": r'(?i)(?:password|passwd|pwd)[\s=:]+["\']([^"\'\s]{8,50})["\']', "severity": "critical", "anchors": ["pass", "pwd"], "validators": ["placeholder"]},
+        {"name": "Password in Config", "pattern": r'(?i)<password>([^<]{8,50})</password>', "severity": "critical", "anchors": ["<password>"], "validators": ["placeholder"]},
+        
+        # 认证信息 - 增加上下文要求
+        {"name": "Basic Auth", "pattern": r'(?i)authorization:\s*basic\s+([a-zA-Z0-9=+/]{20,})', "severity": "high", "anchors": ["authorization"]},
+        
+        # 数据库连接字符串 - 增加上下文要求
+        {"name": "Database Connection", "pattern": r'(?i)(?:postgresql|mysql|mongodb|sqlserver)://[a-zA-Z0-9_]+:([^@\s]{8,50})@[a-zA-Z0-9.\-_]+', "severity": "critical", "anchors": ["://"]},
+        
+        # 云服务凭证 - 增加前缀和上下文要求
+        {"name": "AWS Access Key", "pattern": r'(?i)(?:aws[_-]?access[_-]?key|aws[_-]?key)[\s=:]+["\']?(AKIA[0-9A-Z]{16})["\']?', "severity": "critical", "anchors": ["AKIA"]},
+        {"name": "AWS Secret Key", "pattern": r'(?i)(?:aws[_-]?secret[_-]?access[_-]?key|aws[_-]?secret[_-]?key)[\s=:]+["\']([0-9a-zA-Z/+]{40})["\']', "severity": "critical", "anchors": ["aws"]},
+        {"name": "Google API Key", "pattern": r'(?i)(?:google[_-]?api[_-]?key|gcp[_-]?key)[\s=:]+["\']?(AIza[0-9A-Za-z\-_]{35})["\']?', "severity": "high", "anchors": ["AIza"]},
+        {"name": "Google Cloud Key", "pattern": r'(?i)(?:google[_-]?cloud[_-]?key|gcp[_-]?service[_-]?key)[\s=:]+["\']?(GOOG[0-9A-Za-z\-_]{10,30})["\']?', "severity": "high", "anchors": ["GOOG"]},
+        {"name": "Azure Key", "pattern": r'(?i)(?:azure[_-]?key|microsoft[_-]?azure[_-]?key)[\s=:]+["\']?(AZ[0-9A-Za-z\-_]{34,40})["\']?', "severity": "high", "anchors": ["azure"]},
+        {"name": "IBM Cloud Key", "pattern": r'(?i)(?:ibm[_-]?cloud[_-]?key|bluemix[_-]?key)[\s=:]+["\']?(IBM[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high", "anchors": ["ibm", "bluemix"]},
+        {"name": "Oracle Cloud Key", "pattern": r'(?i)(?:oracle[_-]?cloud[_-]?key|oci[_-]?key)[\s=:]+["\']?(OCID[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high", "anchors": ["OCID"]},
+        {"name": "Alibaba Cloud Key", "pattern": r'(?i)(?:alibaba[_-]?cloud[_-]?key|aliyun[_-]?key)[\s=:]+["\']?(LTAI[0-9A-Za-z\-_]{12,20})["\']?', "severity": "high", "anchors": ["LTAI"]},
+        {"name": "Tencent Cloud Key", "pattern": r'(?i)(?:tencent[_-]?cloud[_-]?key|qcloud[_-]?key)[\s=:]+["\']?(AKID[0-9A-Za-z\-_]{13,20})["\']?', "severity": "high", "anchors": ["AKID"]},
+        {"name": "Huawei Cloud Key", "pattern": r'(?i)(?:huawei[_-]?cloud[_-]?key|hwcloud[_-]?key)[\s=:]+["\']?(AK[0-9A-Za-z\-_]{10,62})["\']?', "severity": "high", "anchors": ["huawei", "hwcloud"]},
+        {"name": "Baidu Cloud Key", "pattern": r'(?i)(?:baidu[_-]?cloud[_-]?key|bce[_-]?key)[\s=:]+["\']?(AK[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high", "anchors": ["baidu", "bce"]},
+        {"name": "JD Cloud Key", "pattern": r'(?i)(?:jd[_-]?cloud[_-]?key|jdcloud[_-]?key)[\s=:]+["\']?(JDC_[A-Z0-9]{28,32})["\']?', "severity": "high", "anchors": ["JDC_"]},
+        {"name": "Volcano Engine Key", "pattern": r'(?i)(?:volcano[_-]?engine[_-]?key|byteplus[_-]?key)[\s=:]+["\']?(AKLT[0-9A-Za-z\-_]{0,252})["\']?', "severity": "high", "anchors": ["AKLT"]},
+        {"name": "UCloud Key", "pattern": r'(?i)(?:ucloud[_-]?key)[\s=:]+["\']?(UC[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high", "anchors": ["ucloud"]},
+        {"name": "China Unicom Cloud Key", "pattern": r'(?i)(?:unicom[_-]?cloud[_-]?key|cucloud[_-]?key)[\s=:]+["\']?(LTC[0-9A-Za-z\-_]{10,60})["\']?', "severity": "high", "anchors": ["unicom", "cucloud"]},
+        {"name": "China Mobile Cloud Key", "pattern": r'(?i)(?:mobile[_-]?cloud[_-]?key|cmcloud[_-]?key)[\s=:]+["\']?(YD[0-9A-Za-z\-_]{10,60})["\']?', "severity": "high", "anchors": ["mobile", "cmcloud"]},
+        {"name": "China Telecom Cloud Key", "pattern": r'(?i)(?:telecom[_-]?cloud[_-]?key|ctcloud[_-]?key)[\s=:]+["\']?(CTC[0-9A-Za-z\-_]{10,60})["\']?', "severity": "high", "anchors": ["telecom", "ctcloud"]},
+        {"name": "Yonyou Cloud Key", "pattern": r'(?i)(?:yonyou[_-]?cloud[_-]?key|yycloud[_-]?key)[\s=:]+["\']?(YY[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high", "anchors": ["yonyou", "yycloud"]},
+        
+        # 个人身份信息 - 增加边界检查
+        {"name": "Email Address", "pattern": r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b', "severity": "medium", "anchors": ["@"], "validators": ["placeholder"]},
+        {"name": "Credit Card", "pattern": r'\b(?:\d[ -]*?){13,16}\b', "severity": "high", "validators": ["luhn"]},
+        {"name": "SSN", "pattern": r'\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b', "severity": "high", "validators": ["ssn"]},
+        {"name": "Phone Number", "pattern": r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b', "severity": "medium", "validators": ["phone"]},
+        
+        # 其他敏感信息 - 增加上下文要求
+        {"name": "Private Key", "pattern": r'-----BEGIN (?:RSA|DSA|EC|OPENSSH) PRIVATE KEY-----', "severity": "critical", "anchors": ["PRIVATE KEY"]},
+        {"name": "License Key", "pattern": r'(?i)(?:license|licence|serial)[_-]?key[\s=:]+["\']?([0-9a-zA-Z\-_]{10,30})["\']?', "severity": "medium", "anchors": ["key"], "validators": ["placeholder"]},
+        {"name": "Sensitive URL", "pattern": r'(?i)(?:admin|login|private|secret)[^\s/]*\.(?:php|asp|aspx|jsp|html)', "severity": "medium", "anchors": [".php", ".asp", ".jsp", ".html"]},
+        
+        # 通用密钥模式 - 增加上下文要求
+        {"name": "Generic Key Pattern", "pattern": r'(?i)(?:access[_-]?key|secret[_-]?key|api[_-]?key|client[_-]?secret|app[_-]?secret)[\s=:]+["\']?([0-9a-zA-Z\-_+=/]{10,100})["\']?', "severity": "high", "anchors": ["key", "secret"], "validators": ["placeholder"], "min_entropy": 3.0},
+        
+        # 配置文件中的敏感信息 - 增加上下文要求
+        {"name": "Config Secret", "pattern": r'(?i)(?:password|passwd|pwd|secret|key|token)[\s=:]+["\']?([^"\'\s]{8,50})["\']?', "severity": "medium", "anchors": ["pass", "pwd", "secret", "key", "token"], "validators": ["placeholder"], "min_entropy": 3.0},
+    ]
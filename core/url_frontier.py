@@ -0,0 +1,220 @@
+import re
+import heapq
+import hashlib
+import posixpath
+import urllib.parse
+
+# 爬虫的 URL 规范化和待下载队列
+#
+# 同一资源常以多种形式出现：主机名大小写、默认端口、片段、百分号编码大小写、查询参数顺序、
+# 跟踪参数、结尾斜杠以及静态资源上的缓存参数（app.js?v=123）。规范化后再去重，
+# 带参数的动态页面按 (路径, 参数名集合) 归为一类并限制每类的数量，
+# 避免参数组合撑爆队列，在文件数上限之内先下载到脚本、样式和配置等更有价值的文件。
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# 统计和广告跟踪参数，不影响页面内容
+TRACKING_PARAMS = re.compile(r'^(?:utm_\w+|fbclid|gclid|msclkid|yclid|_hsenc|_hsmi|mc_cid|mc_eid|spm)$', re.I)
+
+# 优先级：数字越小越先下载
+PRIORITY_ASSET = 0      # 脚本、样式、sourcemap、配置等，最可能包含接口地址和密钥
+PRIORITY_PAGE = 1       # 页面和其他未知类型
+PRIORITY_MEDIA = 2      # 图片、字体、音视频
+
+ASSET_EXTENSIONS = {
+    '.js', '.mjs', '.cjs', '.jsx', '.ts', '.tsx', '.css', '.map', '.json', '.wasm',
+    '.xml', '.txt', '.yml', '.yaml', '.env', '.config', '.conf', '.ini', '.properties',
+}
+MEDIA_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.bmp', '.ico', '.avif',
+    '.woff', '.woff2', '.ttf', '.otf', '.eot',
+    '.mp4', '.webm', '.mp3', '.ogg', '.wav',
+}
+# 带有这些扩展名的 URL 是打包后的静态文件和媒体文件，查询参数只是缓存参数（?v=1.2.3），去重时忽略。
+# .json、.xml、.txt 等经常是接口和分页的站点地图（list.json?page=2、sitemap.xml?p=2），查询参数不能忽略
+STATIC_EXTENSIONS = {'.js', '.mjs', '.cjs', '.css', '.map', '.wasm'} | MEDIA_EXTENSIONS
+
+_PERCENT = re.compile(r'%[0-9a-fA-F]{2}')
+_UNRESERVED = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+
+
+def _normalize_percent(match):
+    # 未保留字符的编码还原为字符，其余编码统一为大写
+    char = chr(int(match.group(0)[1:], 16))
+    return char if char in _UNRESERVED else match.group(0).upper()
+
+
+def _remove_dot_segments(path):
+    if '.' not in path:
+        return path
+    normalized = posixpath.normpath(path)
+    if path.endswith('/') and not normalized.endswith('/'):
+        normalized += '/'
+    # normpath 会保留开头的 //
+    return '/' + normalized.lstrip('/')
+
+
+def normalize_url(url):
+    """返回规范化的 URL：协议和主机小写、去掉默认端口和片段、统一百分号编码、
+    消除路径中的 . 和 ..、去掉跟踪参数并按参数名排序。只做不改变请求语义的变换。
+
+    只处理 http/https URL；其他协议和无法解析的 URL（端口不是数字、IPv6 地址缺少括号等）返回 None。
+    """
+    try:
+        parts = urllib.parse.urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return None
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        # hostname 去掉了 IPv6 地址的方括号
+        host = f"[{host}]"
+    if port and str(port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else '')
+        host = f"{credentials}@{host}"
+
+    path = _PERCENT.sub(_normalize_percent, parts.path) or '/'
+    path = _remove_dot_segments(path)
+
+    # 参数保持原来的写法（?flag 不会变成 ?flag=），只统一编码并按参数名排序；
+    # 排序是稳定的，同名参数（q=b&q=a）保持原来的先后顺序，服务器可能依赖这一顺序
+    params = []
+    for param in parts.query.split('&'):
+        if not param:
+            continue
+        param = _PERCENT.sub(_normalize_percent, param)
+        if not TRACKING_PARAMS.match(urllib.parse.unquote_plus(param.partition('=')[0])):
+            params.append(param)
+    params.sort(key=lambda param: param.partition('=')[0])
+    query = '&'.join(params)
+    return urllib.parse.urlunsplit((scheme, host, path, query, ''))
+
+
+def url_extension(path):
+    return posixpath.splitext(path)[1].lower()
+
+
+def url_priority(url):
+    """按路径的扩展名确定下载优先级"""
+    ext = url_extension(urllib.parse.urlsplit(url).path)
+    if ext in ASSET_EXTENSIONS:
+        return PRIORITY_ASSET
+    if ext in MEDIA_EXTENSIONS:
+        return PRIORITY_MEDIA
+    return PRIORITY_PAGE
+
+
+def dedupe_key(url):
+    """去重用的键：在规范化 URL 的基础上忽略结尾斜杠，静态文件忽略查询参数"""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path.rstrip('/') or '/'
+    query = '' if url_extension(path) in STATIC_EXTENSIONS else parts.query
+    return f"{parts.netloc}{path}?{query}" if query else f"{parts.netloc}{path}"
+
+
+def query_pattern(url):
+    """带参数的 URL 所属的类别：(主机, 路径, 排序后的参数名)，无参数时返回 None"""
+    parts = urllib.parse.urlsplit(url)
+    if not parts.query:
+        return None
+    names = sorted({name for name, _ in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)})
+    return parts.netloc, parts.path, tuple(names)
+
+
+def key_hash(key):
+    """去重键的 64 位哈希（有符号，可以直接存为 SQLite 整数）"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little', signed=True)
+
+
+class VisitedSet:
+    """紧凑的已访问集合：只保存每个键的 64 位哈希（整数），不保存 URL 字符串
+
+    每个条目只占一个小整数，内存占用远小于保存完整 URL 字符串的集合，误判概率可以忽略。
+    """
+
+    def __init__(self):
+        self.hashes = set()
+
+    def add(self, key):
+        """加入一个键，已存在时返回 False"""
+        value = key_hash(key)
+        if value in self.hashes:
+            return False
+        self.hashes.add(value)
+        return True
+
+    def __contains__(self, key):
+        return key_hash(key) in self.hashes
+
+    def __len__(self):
+        return len(self.hashes)
+
+
+class CrawlFrontier:
+    """按 (优先级, 深度, 加入顺序) 出队的待下载队列
+
+    脚本、样式等资源先于页面下载，页面按广度优先；同一深度内保持发现顺序。
+    每个带参数的 URL 类别最多接受 max_query_variants 个不同的 URL。
+    设置了 journal（例如 CrawlState）时，每个被接受的 URL 都会通过 journal.queued(url, depth) 记录下来。
+    """
+
+    def __init__(self, max_depth, max_query_variants=20, journal=None):
+        self.max_depth = max_depth
+        self.max_query_variants = max_query_variants
+        self.visited = VisitedSet()
+        self.pattern_counts = {}
+        self.heap = []
+        self.sequence = 0
+        self.capped = 0  # 因类别数量上限被丢弃的 URL 数
+        self.journal = journal
+
+    def push(self, url, depth):
+        """规范化后加入队列，超过最大深度、无法解析、已访问过或类别已满时返回 False"""
+        if depth > self.max_depth:
+            return False
+        url = normalize_url(url)
+        if url is None or not self.visited.add(dedupe_key(url)):
+            return False
+
+        if not self._count_pattern(url):
+            self.capped += 1
+            return False
+
+        self._push(url, depth)
+        if self.journal:
+            self.journal.queued(url, depth)
+        return True
+
+    def restore(self, url, depth, queued):
+        """恢复上次保存的 URL（已规范化）：登记为已访问，尚未完成的重新放回队列"""
+        self.visited.add(dedupe_key(url))
+        self._count_pattern(url, force=True)
+        if queued:
+            self._push(url, depth)
+
+    def _count_pattern(self, url, force=False):
+        pattern = query_pattern(url)
+        if pattern is None or url_priority(url) == PRIORITY_ASSET:
+            return True
+        count = self.pattern_counts.get(pattern, 0)
+        if count >= self.max_query_variants and not force:
+            return False
+        self.pattern_counts[pattern] = count + 1
+        return True
+
+    def _push(self, url, depth):
+        self.sequence += 1
+        heapq.heappush(self.heap, (url_priority(url), depth, self.sequence, url))
+
+    def pop(self):
+        """取出优先级最高的 URL，返回 (深度, URL)"""
+        _, depth, _, url = heapq.heappop(self.heap)
+        return depth, url
+
+    def __len__(self):
+        return len(self.heap)
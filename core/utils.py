@@ -9,4 +9,10 @@ def open_file(path):
     elif sys.platform == "darwin":  # macOS
         subprocess.call(["open", path])
     else:  # linux
-        subprocess.call(["xdg-open", path])
\ No newline at end of file
+        subprocess.call(["xdg-open", path])
+
+def get_cache_dir(*parts):
+    """获取工具的本地缓存目录（~/.ash_tools/cache），不存在时自动创建"""
+    path = os.path.join(os.path.expanduser("~/.ash_tools"), "cache", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
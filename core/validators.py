@@ -0,0 +1,134 @@
+import math
+import re
+from collections import Counter
+
+# 第二阶段校验：正则命中后再按规则声明的校验器过滤，去掉明显的误报
+# 校验器以整批值为输入、返回同样长度的布尔列表，每个文件的同一规则只调用一次
+
+_NON_DIGIT = re.compile(r'\D')
+
+# 整个值等于这些词时视为占位符
+PLACEHOLDER_VALUES = {
+    'password', 'passwd', 'secret', 'changeme', 'change_me', 'null', 'none', 'nil', 'undefined',
+    'true', 'false', 'todo', 'fixme', 'default', 'string', 'example', 'placeholder', 'redacted',
+    'password123', '12345678', '123456789', 'qwertyui', 'abcdefgh', 'abcdefghij',
+}
+
+# 值中包含这些片段时视为占位符或模板变量
+PLACEHOLDER_FRAGMENTS = (
+    'example', 'your_', 'your-', 'yourkey', 'placeholder', 'xxxxx', '*****', '.....', '${', '{{',
+    '<%', '%s', 'process.env', 'dummy', 'sample', 'replace_me', 'insert_', 'redacted',
+)
+
+
+def luhn_valid(values):
+    """信用卡号 Luhn 校验，并要求 13-19 位数字"""
+    results = []
+    for value in values:
+        digits = _NON_DIGIT.sub('', value)
+        if not 13 <= len(digits) <= 19 or len(set(digits)) == 1:
+            results.append(False)
+            continue
+        total = 0
+        for index, char in enumerate(reversed(digits)):
+            digit = ord(char) - 48
+            if index % 2:
+                digit *= 2
+                if digit > 9:
+                    digit -= 9
+            total += digit
+        results.append(total % 10 == 0)
+    return results
+
+
+def ssn_valid(values):
+    """美国社会安全号规则：区号不能为 000/666/9xx，组号不能为 00，序号不能为 0000"""
+    results = []
+    for value in values:
+        digits = _NON_DIGIT.sub('', value)
+        if len(digits) != 9:
+            results.append(False)
+            continue
+        area, group, serial = digits[:3], digits[3:5], digits[5:]
+        results.append(
+            area not in ('000', '666') and area[0] != '9' and group != '00' and serial != '0000'
+        )
+    return results
+
+
+def phone_valid(values):
+    """北美号码规则：区号和局号首位为 2-9，且不能全部是同一个数字"""
+    results = []
+    for value in values:
+        digits = _NON_DIGIT.sub('', value)
+        if len(digits) == 11 and digits[0] == '1':
+            digits = digits[1:]
+        results.append(
+            len(digits) == 10 and digits[0] >= '2' and digits[3] >= '2' and len(set(digits)) > 2
+        )
+    return results
+
+
+def not_placeholder(values):
+    """过滤示例值、模板变量和由单一字符组成的值"""
+    results = []
+    for value in values:
+        lowered = value.lower()
+        results.append(
+            lowered not in PLACEHOLDER_VALUES
+            and len(set(lowered)) > 2
+            and not any(fragment in lowered for fragment in PLACEHOLDER_FRAGMENTS)
+        )
+    return results
+
+
+def shannon_entropy(value):
+    """计算字符串的香农熵（每字符比特数）"""
+    if not value:
+        return 0.0
+    length = len(value)
+    return -sum(count / length * math.log2(count / length) for count in Counter(value).values())
+
+
+VALIDATORS = {
+    'luhn': luhn_valid,
+    'ssn': ssn_valid,
+    'phone': phone_valid,
+    'placeholder': not_placeholder,
+}
+
+# 短值的熵上限只有 log2(长度)（8 个字符最多 3 bit），人工设置的口令也很少接近上限，
+# 因此实际阈值取 min(min_entropy, ENTROPY_SCALE * log2(长度))，其余误报交给占位符校验
+ENTROPY_SCALE = 0.6
+
+
+def entropy_threshold(value, min_entropy):
+    """按值的长度缩放后的最小熵"""
+    return min(min_entropy, ENTROPY_SCALE * math.log2(max(len(value), 2)))
+
+
+def validate_values(values, validators=None, min_entropy=None):
+    """对一批值依次应用校验器，返回每个值是否通过
+
+    相同的值只校验一次（同一个文件中重复出现的值很常见）。
+    min_entropy 是长值的阈值，短值的阈值按长度缩放（见 entropy_threshold）。
+    """
+    unique = list(dict.fromkeys(values))
+    passed = [True] * len(unique)
+
+    for name in validators or ():
+        pending = [index for index, ok in enumerate(passed) if ok]
+        if not pending:
+            break
+        verdicts = VALIDATORS[name]([unique[index] for index in pending])
+        for index, ok in zip(pending, verdicts):
+            passed[index] = ok
+
+    if min_entropy:
+        for index, ok in enumerate(passed):
+            value = unique[index]
+            if ok and shannon_entropy(value) < entropy_threshold(value, min_entropy):
+                passed[index] = False
+
+    verdict = dict(zip(unique, passed))
+    return [verdict[value] for value in values]
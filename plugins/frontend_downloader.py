@@ -2,13 +2,12 @@ import os
 import re
 import json
 import time
-import queue
+import tempfile
 import threading
-import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import urllib.parse
 import urllib.robotparser
 import subprocess  # 添加导入
-from bs4 import BeautifulSoup
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
     QPushButton, QFileDialog, QTreeWidget, QTreeWidgetItem,
@@ -18,31 +17,82 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QIcon, QBrush, QColor
 from plugins.base_plugin import BasePlugin
+from core.link_extractor import decode_body, extract_html_links, extract_css_links, extract_js_links
+from core.http_cache import HttpCache, new_content_hash
+from core.blob_store import BlobStore, replace_file
+from core.url_frontier import CrawlFrontier, normalize_url
+from core.crawl_state import CrawlState, STATE_SKIPPED
+from core.scan_pipeline import ScanPipeline
+from core.findings_store import FindingsSink, FindingsIndex, new_sink_path
+from core.http_transport import (
+    HTTP2_AVAILABLE, TransportStats, create_session, response_protocol, wire_bytes
+)
+from core.utils import get_cache_dir
 
 class WebsiteDownloaderThread(QThread):
     progress = pyqtSignal(int, str, int, int)
     download_finished = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
+    findings_found = pyqtSignal(list)   # 边下载边扫描时分批发送的敏感信息
+    files_downloaded = pyqtSignal(list) # 下载过程中分批发送的文件信息，界面据此增量构建文件树
+
+    # 文件信息攒够一批或距上次发送超过一定时间后发送给界面
+    BATCH_SIZE = 200
+    BATCH_INTERVAL = 0.3
 
-    def __init__(self, url, output_dir, max_depth, max_files, respect_robots):
+    # 这些类型的响应体在写入磁盘的同时保留在内存中，用于提取链接
+    PARSED_TYPES = ('html', 'css', 'javascript')
+    # 边下载边扫描时，这些类型的响应体直接交给敏感信息扫描
+    SCANNED_TYPES = ('html', 'javascript', 'json')
+    # 超过该大小的页面不保留在内存中，也不再提取链接
+    MAX_PARSE_SIZE = 20 * 1024 * 1024
+
+    def __init__(self, url, output_dir, max_depth, max_files, respect_robots, workers=8, per_host_connections=6,
+                 use_http_cache=True, cache_path=None, use_blob_store=True, blob_root=None, max_query_variants=20,
+                 resume=False, scan_sensitive=False, scan_workers=2, http2=False):
         super().__init__()
         self.base_url = url
         self.output_dir = output_dir
         self.max_depth = max_depth
         self.max_files = max_files
         self.respect_robots = respect_robots
+        self.workers = max(1, workers)  # 同时进行的下载数
         self.running = True
-        self.visited = set()
-        self.queue = queue.Queue()
+        # 待下载队列：URL 规范化后去重，脚本和样式先于页面，页面按深度依次取出
+        self.frontier = CrawlFrontier(max_depth, max_query_variants)
+        self.visited = self.frontier.visited
+        self.resume = resume  # 从输出目录中保存的进度继续下载
+        self.state = None
+        self.scan_sensitive = scan_sensitive  # 下载的同时扫描敏感信息，不必在下载完成后再读一遍磁盘
+        self.scan_workers = scan_workers
+        self.pipeline = None
+        self.findings_sink = None
+        self.findings_path = None
+        self.total_findings = 0
+        # 需要保留在内存中的响应体类型
+        self.kept_types = set(self.PARSED_TYPES) | (set(self.SCANNED_TYPES) if scan_sensitive else set())
         self.downloaded_files = []
+        self.pending_files = []
+        self.last_flush = 0
+        self.unchanged_files = 0
+        self.duplicate_files = 0
+        self.use_http_cache = use_http_cache  # 重复下载同一站点时发送条件请求，未变化的文件不重新传输和写入
+        self.cache_path = cache_path or os.path.join(get_cache_dir(), "http_cache.db")
+        self.http_cache = None
+        # 下载的文件按内容哈希只保存一份，镜像目录中的文件是指向它的硬链接
+        self.blob_store = BlobStore(blob_root) if use_blob_store else None
         self.robots_parser = urllib.robotparser.RobotFileParser()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # HTTP/1.1 时每个主机最多 per_host_connections 个连接；HTTP/2 时同一主机的请求在一条连接上多路复用
+        self.http2 = http2
+        self.session, self.transport = create_session(
+            {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'},
+            per_host_connections=per_host_connections,
+            http2=http2
+        )
+        self.transport_stats = TransportStats()  # 按实际协议统计请求数、传输字节数和速度
         
         # 解析基础URL
-        parsed_url = urllib.parse.urlparse(self.base_url)
+        parsed_url = urllib.parse.urlparse(normalize_url(self.base_url))
         self.base_domain = parsed_url.netloc
         self.base_scheme = parsed_url.scheme
         self.base_path = parsed_url.path
@@ -51,6 +101,42 @@ class WebsiteDownloaderThread(QThread):
         try:
             # 创建输出目录
             os.makedirs(self.output_dir, exist_ok=True)
+            if self.http2 and not HTTP2_AVAILABLE:
+                self.progress.emit(0, "未安装 httpx[http2]，使用 HTTP/1.1 下载", 0, 0)
+            if self.use_http_cache:
+                self.http_cache = HttpCache(self.cache_path)
+            if self.blob_store:
+                if not self.blob_store.can_link(self.output_dir):
+                    # 复制到镜像目录会让每个文件保存两份，不如直接写入
+                    self.progress.emit(0, "输出目录无法硬链接到内容存储（不在同一磁盘或文件系统不支持），直接保存文件", 0, 0)
+                    self.blob_store = None
+                else:
+                    removed, freed = self.blob_store.prune()
+                    if removed:
+                        self.progress.emit(0, f"已清理 {removed} 个不再使用的存储对象，释放 {self.format_size(freed)}", 0, 0)
+            
+            # 进度随下载增量保存，停止或出错后可以继续
+            self.state = CrawlState(self.output_dir)
+            if self.resume and self.state.base_url() == normalize_url(self.base_url):
+                self.downloaded_files = self.state.restore(self.frontier)
+                self.pending_files.extend(self.downloaded_files)
+                self.flush_files()
+                self.progress.emit(
+                    0,
+                    f"继续上次的下载: 已完成 {len(self.downloaded_files)} 个文件，待下载 {len(self.frontier)} 个URL",
+                    len(self.downloaded_files),
+                    len(self.visited)
+                )
+            else:
+                if self.resume:
+                    self.progress.emit(0, "输出目录中没有该网站的下载进度，重新开始下载", 0, 0)
+                self.state.reset(normalize_url(self.base_url))
+            self.frontier.journal = self.state
+            
+            if self.scan_sensitive:
+                self.pipeline = ScanPipeline(workers=self.scan_workers)
+                self.findings_path = new_sink_path("crawl")
+                self.findings_sink = FindingsSink(self.findings_path)
             
             # 检查robots.txt
             if self.respect_robots:
@@ -61,107 +147,328 @@ class WebsiteDownloaderThread(QThread):
                     self.progress.emit(0, f"无法读取robots.txt: {str(e)}，继续下载...", 0, 0)
             
             # 添加起始URL到队列
-            self.queue.put((self.base_url, 0))
-            self.visited.add(self.base_url)
+            self.enqueue(self.base_url, 0)
             
-            # 开始下载
-            total_files = 0
-            while not self.queue.empty() and self.running and total_files < self.max_files:
-                url, depth = self.queue.get()
-                
-                if depth > self.max_depth:
-                    continue
-                
-                # 检查robots.txt是否允许访问
-                if self.respect_robots and not self.robots_parser.can_fetch("*", url):
-                    self.progress.emit(0, f"跳过被robots.txt禁止的URL: {url}", len(self.downloaded_files), len(self.visited))
-                    continue
-                
-                # 下载文件
-                file_info = self.download_file(url)
-                if file_info:
-                    self.downloaded_files.append(file_info)
-                    total_files += 1
+            # 并发下载：调度循环始终从最浅的一层取 URL 提交给线程池，
+            # 下载完成后在本线程中合并新发现的链接，visited 和待下载队列只在本线程中访问
+            # 多个 URL 可能对应同一个本地文件（查询参数不同、/dir/ 与 /dir/index.html），
+            # 同一本地路径同时只下载一个，其余 URL 在 busy_paths 中等待，该路径空出后放入 ready 重新调度
+            total_files = len(self.downloaded_files)
+            finished = 0
+            in_flight = {}      # future -> (URL, 本地路径)
+            busy_paths = {}     # 正在下载的本地路径 -> 等待该路径的 [(深度, URL)]
+            ready = []          # 本地路径已空出、等待重新调度的 (深度, URL)
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                while self.running:
+                    while ((ready or self.frontier) and len(in_flight) < self.workers
+                           and total_files + len(in_flight) < self.max_files):
+                        depth, url = ready.pop() if ready else self.frontier.pop()
+                        
+                        # 检查robots.txt是否允许访问
+                        if self.respect_robots and not self.robots_parser.can_fetch("*", url):
+                            self.progress.emit(0, f"跳过被robots.txt禁止的URL: {url}", len(self.downloaded_files), len(self.visited))
+                            self.state.finished(url, state=STATE_SKIPPED)
+                            continue
+                        local_path = self.local_path_for(url)
+                        if local_path in busy_paths:
+                            busy_paths[local_path].append((depth, url))
+                            continue
+                        busy_paths[local_path] = []
+                        cached = self.http_cache.lookup(url, local_path) if self.http_cache else None
+                        in_flight[pool.submit(self.fetch, url, depth, cached)] = (url, local_path)
                     
-                    # 解析HTML文件以获取更多链接
-                    if file_info['type'] == 'html':
-                        self.parse_links(file_info['local_path'], url, depth + 1)
-                
-                # 更新进度 - 修复括号不匹配问题
-                processed = len(self.visited) - self.queue.qsize()
-                total = len(self.visited) + self.queue.qsize()
-                
-                if total > 0:
-                    progress = int((processed / total) * 100)
-                else:
-                    progress = 100
-                
-                # 获取当前文件名
-                current_file = os.path.basename(file_info['local_path']) if file_info else "处理中..."
+                    if not in_flight:
+                        break
+                    
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url, local_path = in_flight.pop(future)
+                        # 按发现顺序重新调度等待同一路径的 URL（ready 从末尾取出）
+                        ready.extend(reversed(busy_paths.pop(local_path)))
+                        finished += 1
+                        file_info, links, depth, body = future.result()
+                        if self.running:
+                            # 停止时被中断的下载保持待下载状态，继续时重新下载
+                            self.state.finished(url, file_info)
+                        if file_info:
+                            self.downloaded_files.append(file_info)
+                            self.add_file(file_info)
+                            total_files += 1
+                            if file_info['status'] == 'unchanged':
+                                self.unchanged_files += 1
+                            if file_info['duplicate']:
+                                self.duplicate_files += 1
+                            if self.http_cache:
+                                self.http_cache.store(
+                                    file_info['url'], file_info['etag'], file_info['last_modified'],
+                                    file_info['content_hash'], file_info['content_type_header'],
+                                    file_info['local_path'], file_info['size']
+                                )
+                        for link in links:
+                            self.enqueue(link, depth + 1)
+                        if body is not None and file_info['type'] in self.SCANNED_TYPES:
+                            self.pipeline.submit(file_info['local_path'], body, file_info['content_hash'], {"url": file_info['url']})
+                        if self.pipeline:
+                            self.emit_findings(self.pipeline.drain())
+                        
+                        # 更新进度
+                        total = finished + len(in_flight) + len(self.frontier) + len(ready)
+                        progress = int(finished / total * 100) if total else 100
+                        current_file = os.path.basename(file_info['local_path']) if file_info else "处理中..."
+                        self.progress.emit(
+                            min(progress, 100),  # 确保不超过100%
+                            f"下载: {current_file}",
+                            len(self.downloaded_files),
+                            len(self.visited)
+                        )
                 
-                self.progress.emit(
-                    min(progress, 100),  # 确保不超过100%
-                    f"下载: {current_file}", 
-                    len(self.downloaded_files), 
-                    len(self.visited)
-                )
+                # 停止时取消尚未开始的下载
+                for future in in_flight:
+                    future.cancel()
+            
+            if self.pipeline and self.running:
+                # 等待剩余的文件扫描完成
+                self.emit_findings(self.pipeline.drain(wait=True))
+            
+            if self.frontier.capped:
+                self.progress.emit(100, f"已跳过 {self.frontier.capped} 个超出同类数量上限的参数化URL", len(self.downloaded_files), len(self.visited))
             
             # 完成下载
+            self.flush_files()
             self.download_finished.emit({
                 'base_url': self.base_url,
                 'output_dir': self.output_dir,
                 'files': self.downloaded_files,
                 'total_files': len(self.downloaded_files),
-                'visited_urls': len(self.visited)
+                'unchanged_files': self.unchanged_files,
+                'duplicate_files': self.duplicate_files,
+                'visited_urls': len(self.visited),
+                'total_findings': self.total_findings,
+                'findings_path': self.findings_path,
+                'transport_stats': self.transport_stats.summary()
             })
-            self.progress.emit(100, f"下载完成! 共下载 {len(self.downloaded_files)} 个文件", len(self.downloaded_files), len(self.visited))
+            self.progress.emit(
+                100,
+                f"下载完成! 共下载 {len(self.downloaded_files)} 个文件，其中 {self.unchanged_files} 个未变化，"
+                f"{self.duplicate_files} 个与已保存的内容重复",
+                len(self.downloaded_files),
+                len(self.visited)
+            )
+            for protocol, stats in sorted(self.transport_stats.summary().items()):
+                self.progress.emit(
+                    100,
+                    f"{protocol}: {stats['requests']} 个请求，传输 {self.format_size(stats['wire_bytes'])}"
+                    f"（解压后 {self.format_size(stats['bytes'])}，{stats['ratio']:.0%}），"
+                    f"平均 {self.format_size(stats['throughput'])}/s",
+                    len(self.downloaded_files),
+                    len(self.visited)
+                )
+            if self.pipeline:
+                self.progress.emit(
+                    100,
+                    f"扫描了 {self.pipeline.scanned_files} 个文件，发现 {self.total_findings} 条敏感信息，结果已保存到: {self.findings_path}",
+                    len(self.downloaded_files),
+                    len(self.visited)
+                )
             
         except Exception as e:
             error_msg = f"下载出错: {str(e)}"
             self.progress.emit(0, error_msg, len(self.downloaded_files), len(self.visited))
             self.error_occurred.emit(error_msg)
+        finally:
+            if self.http_cache:
+                self.http_cache.close()
+                self.http_cache = None
+            if self.state:
+                self.state.close()
+                self.state = None
+            if self.pipeline:
+                self.pipeline.close(wait=False)
+            if self.findings_sink:
+                self.findings_sink.close()
+            self.session.close()
 
-    def download_file(self, url):
-        """下载单个文件"""
+    @staticmethod
+    def format_size(size):
+        """格式化文件大小"""
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if size < 1024.0:
+                return f"{size:.1f} {unit}"
+            size /= 1024.0
+        return f"{size:.1f} GB"
+
+    def add_file(self, file_info):
+        """暂存文件信息，攒够一批或超过发送间隔时统一发送"""
+        self.pending_files.append(file_info)
+        if (len(self.pending_files) >= self.BATCH_SIZE
+                or time.monotonic() - self.last_flush >= self.BATCH_INTERVAL):
+            self.flush_files()
+
+    def flush_files(self):
+        """把暂存的文件信息发送给界面"""
+        self.last_flush = time.monotonic()
+        if not self.pending_files:
+            return
+        batch = self.pending_files
+        self.pending_files = []
+        self.files_downloaded.emit(batch)
+
+    def emit_findings(self, findings):
+        """把流水线产生的结果写入结果文件并发送给界面"""
+        if not findings:
+            return
+        self.findings_sink.write(findings)
+        self.total_findings += len(findings)
+        self.findings_found.emit(findings)
+
+    def enqueue(self, url, depth):
+        """把新发现的 URL 加入待下载队列（超过最大深度、已访问过或同类参数化 URL 过多的忽略）"""
+        self.frontier.push(url, depth)
+
+    def fetch(self, url, depth, cached=None):
+        """在线程池中下载一个 URL，页面、样式和脚本同时解析出其中的链接
+
+        返回 (文件信息, 链接列表, 深度, 响应体)；响应体只在需要扫描时返回，否则为 None。
+        """
+        if not self.running:
+            return None, [], depth, None
+        file_info, body = self.download_file(url, cached)
+        links = []
+        if body is not None and file_info['type'] in self.PARSED_TYPES and depth < self.max_depth:
+            text = decode_body(body, file_info['content_type_header'])
+            links = self.parse_links(text, url, file_info['type'])
+        if not self.scan_sensitive:
+            body = None
+        return file_info, links, depth, body
+
+    def local_path_for(self, url):
+        """URL 在输出目录中对应的本地文件路径"""
+        path = urllib.parse.urlparse(url).path
+        
+        # 处理目录路径
+        if path.endswith('/'):
+            path += 'index.html'
+        return os.path.join(self.output_dir, path.lstrip('/'))
+
+    def download_file(self, url, cached=None):
+        """下载单个文件，返回 (文件信息, 响应体)
+
+        需要提取链接或扫描的文件在写入磁盘的同时保留在内存中，不必再从磁盘读回；
+        其他文件的响应体为 None。
+
+        cached 为上次下载时的缓存条目：据此发送条件请求，服务器返回 304 时沿用本地文件；
+        响应体先写入临时文件，内容哈希与上次相同时丢弃临时文件，本地文件保持不变。
+        文件信息的 status 为 new、modified 或 unchanged。
+
+        启用内容存储时，新内容收入存储后再硬链接到本地路径；内容已存在（其他 URL 或其他站点下载过）
+        时只建立链接，文件信息的 duplicate 为 True。
+        """
+        part_path = None
         try:
-            # 获取文件路径
-            parsed_url = urllib.parse.urlparse(url)
-            path = parsed_url.path
-            
-            # 处理目录路径
-            if path.endswith('/'):
-                path += 'index.html'
-            
             # 创建本地路径
-            local_path = os.path.join(self.output_dir, path.lstrip('/'))
+            local_path = self.local_path_for(url)
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
             
             # 下载文件
-            response = self.session.get(url, stream=True, timeout=10)
+            started = time.monotonic()
+            response = self.session.get(url, stream=True, timeout=10, headers=HttpCache.conditional_headers(cached))
+            if response.status_code == 304 and cached:
+                response.close()
+                self.transport_stats.record(response_protocol(response), 0, 0, time.monotonic() - started)
+                return self.reuse_cached(url, cached, response)
             response.raise_for_status()
             
-            # 保存文件
-            with open(local_path, 'wb') as f:
+            # 获取文件类型
+            content_type_header = response.headers.get('Content-Type', '')
+            content_type = content_type_header.split(';')[0]
+            file_type = self.get_file_type(content_type, local_path)
+            chunks = [] if file_type in self.kept_types else None
+            
+            # 保存文件：写完并确认内容有变化后再替换本地文件，中途停止不会留下不完整的文件
+            size = 0
+            digest = new_content_hash()
+            # 临时文件名唯一，同一路径的重复下载或残留的临时文件不会互相覆盖
+            fd, part_path = tempfile.mkstemp(
+                dir=os.path.dirname(local_path), prefix=os.path.basename(local_path) + '.', suffix='.part'
+            )
+            with os.fdopen(fd, 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     if not self.running:
-                        return None
+                        return None, None
                     f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    if chunks is not None:
+                        chunks.append(chunk)
+                        if size > self.MAX_PARSE_SIZE:
+                            chunks = None
+            self.transport_stats.record(response_protocol(response), wire_bytes(response, size), size, time.monotonic() - started)
             
-            # 获取文件类型
-            content_type = response.headers.get('Content-Type', '').split(';')[0]
-            file_type = self.get_file_type(content_type, local_path)
+            content_hash = digest.hexdigest()
+            duplicate = False
+            if cached and cached['content_hash'] == content_hash:
+                status = 'unchanged'
+            else:
+                # mkstemp 创建的文件只有所有者可读写，改为普通文件的权限
+                os.chmod(part_path, 0o644)
+                if self.blob_store:
+                    blob_path, duplicate = self.blob_store.put(part_path, content_hash)
+                    part_path = None
+                    self.blob_store.link(blob_path, local_path)
+                else:
+                    replace_file(part_path, local_path)
+                    part_path = None
+                status = 'modified' if cached else 'new'
             
-            return {
+            file_info = {
                 'url': url,
                 'local_path': local_path,
-                'size': os.path.getsize(local_path),
+                'size': size,
                 'type': file_type,
-                'content_type': content_type
+                'content_type': content_type,
+                'content_type_header': content_type_header,
+                'status': status,
+                'duplicate': duplicate,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content_hash': content_hash
             }
+            return file_info, b''.join(chunks) if chunks is not None else None
             
         except Exception as e:
             self.progress.emit(0, f"下载失败: {url} - {str(e)}", len(self.downloaded_files), len(self.visited))
-            return None
+            return None, None
+        finally:
+            if part_path:
+                try:
+                    os.remove(part_path)
+                except OSError:
+                    pass
+
+    def reuse_cached(self, url, cached, response):
+        """服务器返回 304 时沿用本地文件，需要提取链接或扫描的类型从本地文件读回内容"""
+        content_type_header = cached['content_type'] or ''
+        content_type = content_type_header.split(';')[0]
+        file_type = self.get_file_type(content_type, cached['local_path'])
+        file_info = {
+            'url': url,
+            'local_path': cached['local_path'],
+            'size': cached['size'],
+            'type': file_type,
+            'content_type': content_type,
+            'content_type_header': content_type_header,
+            'status': 'unchanged',
+            'duplicate': False,
+            # 304 响应可能带有新的校验值，没有时沿用原来的
+            'etag': response.headers.get('ETag') or cached['etag'],
+            'last_modified': response.headers.get('Last-Modified') or cached['last_modified'],
+            'content_hash': cached['content_hash']
+        }
+        body = None
+        if file_type in self.kept_types and cached['size'] <= self.MAX_PARSE_SIZE:
+            with open(cached['local_path'], 'rb') as f:
+                body = f.read()
+        return file_info, body
 
     def get_file_type(self, content_type, path):
         """根据内容和路径获取文件类型"""
@@ -169,8 +476,10 @@ class WebsiteDownloaderThread(QThread):
             return 'html'
         elif 'css' in content_type or path.endswith('.css'):
             return 'css'
-        elif 'javascript' in content_type or path.endswith('.js'):
+        elif 'javascript' in content_type or path.endswith(('.js', '.mjs')):
             return 'javascript'
+        elif 'json' in content_type or path.endswith(('.json', '.map')):
+            return 'json'
         elif 'image' in content_type:
             return 'image'
         elif 'font' in content_type:
@@ -187,50 +496,37 @@ class WebsiteDownloaderThread(QThread):
             else:
                 return 'other'
 
-    def parse_links(self, file_path, base_url, depth):
-        """解析HTML文件中的链接"""
+    def parse_links(self, text, base_url, file_type='html'):
+        """提取页面、样式表或脚本中引用的资源，返回同域的绝对 URL 列表
+
+        脚本中的动态 import()、webpack chunk、sourcemap 和样式中的 url()/@import 也会加入下载队列，
+        页面中内联的样式和脚本同样会被扫描。
+        """
+        links = []
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            soup = BeautifulSoup(content, 'html.parser')
+            if file_type == 'css':
+                found = extract_css_links(text, base_url)
+            elif file_type == 'javascript':
+                found = extract_js_links(text, base_url)
+            else:
+                found = extract_html_links(text, base_url)
+                found += extract_css_links(text, base_url) + extract_js_links(text, base_url)
             
-            # 查找所有链接
-            for tag in soup.find_all(['a', 'link', 'script', 'img', 'source', 'iframe']):
-                url = None
-                if tag.name == 'a' and tag.get('href'):
-                    url = tag['href']
-                elif tag.name == 'link' and tag.get('href'):
-                    url = tag['href']
-                elif tag.name == 'script' and tag.get('src'):
-                    url = tag['src']
-                elif tag.name in ['img', 'source'] and tag.get('src'):
-                    url = tag['src']
-                elif tag.name == 'iframe' and tag.get('src'):
-                    url = tag['src']
-                
-                if not url:
+            for absolute_url in found:
+                # 非HTTP链接（mailto:、javascript: 等）和无法解析的链接返回 None
+                absolute_url = normalize_url(absolute_url)
+                if absolute_url is None:
                     continue
                 
-                # 解析URL并规范化
-                absolute_url = urllib.parse.urljoin(base_url, url)
-                parsed_url = urllib.parse.urlparse(absolute_url)
-                # 移除片段标识符
-                absolute_url = parsed_url._replace(fragment="").geturl()
-                
-                # 过滤外部链接和非HTTP链接
-                if parsed_url.netloc != self.base_domain:
-                    continue
-                if not parsed_url.scheme.startswith('http'):
+                # 过滤外部链接
+                if urllib.parse.urlsplit(absolute_url).netloc != self.base_domain:
                     continue
                 
-                # 添加到队列
-                if absolute_url not in self.visited:
-                    self.visited.add(absolute_url)
-                    self.queue.put((absolute_url, depth))
+                links.append(absolute_url)
             
         except Exception as e:
-            self.progress.emit(0, f"解析链接失败: {file_path} - {str(e)}", len(self.downloaded_files), len(self.visited))
+            self.progress.emit(0, f"解析链接失败: {base_url} - {str(e)}", len(self.downloaded_files), len(self.visited))
+        return links
 
     def stop(self):
         self.running = False
@@ -258,6 +554,11 @@ class WebsiteDownloaderWidget(QWidget):
         super().__init__()
         self.output_dir = os.path.expanduser("~/website_downloads")
         self.downloader = None
+        self.findings_index = FindingsIndex()   # 按 (规则, 密钥指纹) 聚合下载过程中发现的敏感信息
+        self.tree_root = None                   # 文件树的根节点
+        self.dir_items = {}                     # 相对目录路径 -> 目录节点
+        self.file_items = {}                    # 本地文件路径 -> 文件节点
+        self.finding_items = []                 # 分组编号 -> 结果列表中的节点
         self.init_ui()
 
     def init_ui(self):
@@ -299,22 +600,69 @@ class WebsiteDownloaderWidget(QWidget):
         self.max_files_label = QLabel("最大文件数:")
         self.max_files_input = QLineEdit("500")
         self.max_files_input.setToolTip("最多下载的文件数量")
+        self.query_variants_label = QLabel("同类参数化URL上限:")
+        self.query_variants_input = QLineEdit("20")
+        self.query_variants_input.setToolTip("路径和参数名都相同、只有参数值不同的页面最多下载的数量")
         max_files_layout.addWidget(self.max_files_label)
         max_files_layout.addWidget(self.max_files_input)
+        max_files_layout.addWidget(self.query_variants_label)
+        max_files_layout.addWidget(self.query_variants_input)
+        
+        # 并发设置
+        concurrency_layout = QHBoxLayout()
+        self.workers_label = QLabel("并发下载数:")
+        self.workers_input = QLineEdit("8")
+        self.workers_input.setToolTip("同时进行的下载数量")
+        self.per_host_label = QLabel("每主机连接数:")
+        self.per_host_input = QLineEdit("6")
+        self.per_host_input.setToolTip("对同一主机最多同时建立的连接数")
+        concurrency_layout.addWidget(self.workers_label)
+        concurrency_layout.addWidget(self.workers_input)
+        concurrency_layout.addWidget(self.per_host_label)
+        concurrency_layout.addWidget(self.per_host_input)
         
         # robots.txt 尊重
         self.robots_check = QCheckBox("尊重robots.txt")
         self.robots_check.setChecked(True)
         
+        # HTTP 缓存
+        self.http_cache_check = QCheckBox("使用HTTP缓存")
+        self.http_cache_check.setChecked(True)
+        self.http_cache_check.setToolTip("记录每个文件的 ETag/Last-Modified 和内容哈希，重复下载时跳过未变化的文件")
+        
+        # 内容去重
+        self.blob_store_check = QCheckBox("内容去重存储")
+        self.blob_store_check.setChecked(True)
+        self.blob_store_check.setToolTip("相同内容的文件只保存一份，镜像目录中的文件是指向它的只读硬链接")
+        
         config_layout.addLayout(depth_layout)
         config_layout.addLayout(max_files_layout)
+        config_layout.addLayout(concurrency_layout)
         config_layout.addWidget(self.robots_check)
+        config_layout.addWidget(self.http_cache_check)
+        config_layout.addWidget(self.blob_store_check)
+        
+        # 边下载边扫描
+        self.scan_check = QCheckBox("下载时扫描敏感信息")
+        self.scan_check.setChecked(False)
+        self.scan_check.setToolTip("下载到的页面、脚本和 JSON 直接在内存中扫描，下载完成时即可得到结果")
+        config_layout.addWidget(self.scan_check)
+        
+        # HTTP/2
+        self.http2_check = QCheckBox("使用HTTP/2")
+        self.http2_check.setChecked(False)
+        self.http2_check.setToolTip("同一主机的请求在一条连接上多路复用（需要安装 httpx[http2]，服务器不支持时自动回退到 HTTP/1.1）")
+        self.http2_check.setEnabled(HTTP2_AVAILABLE)
+        config_layout.addWidget(self.http2_check)
         config_group.setLayout(config_layout)
         
         # 控制按钮
         control_layout = QHBoxLayout()
         self.download_btn = QPushButton("开始下载")
-        self.download_btn.clicked.connect(self.start_download)
+        self.download_btn.clicked.connect(lambda: self.start_download())
+        self.resume_btn = QPushButton("继续下载")
+        self.resume_btn.setToolTip("从输出目录中保存的进度继续上次停止或中断的下载，已完成的文件不再下载")
+        self.resume_btn.clicked.connect(lambda: self.start_download(resume=True))
         self.stop_btn = QPushButton("停止")
         self.stop_btn.setEnabled(False)
         self.stop_btn.clicked.connect(self.stop_download)
@@ -323,6 +671,7 @@ class WebsiteDownloaderWidget(QWidget):
         self.open_btn.setEnabled(False)
         
         control_layout.addWidget(self.download_btn)
+        control_layout.addWidget(self.resume_btn)
         control_layout.addWidget(self.stop_btn)
         control_layout.addWidget(self.open_btn)
         
@@ -354,6 +703,20 @@ class WebsiteDownloaderWidget(QWidget):
         self.file_tree.customContextMenuRequested.connect(self.show_file_context_menu)
         self.file_tree.setSortingEnabled(True)
         
+        # 敏感信息结果（同一个密钥只显示一行）
+        self.findings_tree = QTreeWidget()
+        self.findings_tree.setHeaderLabels(["类型", "严重程度", "匹配内容", "次数", "文件", "URL"])
+        self.findings_tree.setColumnWidth(0, 160)
+        self.findings_tree.setColumnWidth(1, 80)
+        self.findings_tree.setColumnWidth(2, 300)
+        self.findings_tree.setColumnWidth(3, 50)
+        self.findings_tree.setColumnWidth(4, 300)
+        self.findings_tree.setRootIsDecorated(False)
+        
+        self.result_tabs = QTabWidget()
+        self.result_tabs.addTab(self.file_tree, "文件")
+        self.result_tabs.addTab(self.findings_tree, "敏感信息")
+        
         # 日志区域
         self.log_area = QTextEdit()
         self.log_area.setReadOnly(True)
@@ -367,7 +730,7 @@ class WebsiteDownloaderWidget(QWidget):
         main_layout.addWidget(self.progress_bar)
         main_layout.addWidget(self.status_label)
         main_layout.addLayout(stats_layout)
-        main_layout.addWidget(self.file_tree, 3)
+        main_layout.addWidget(self.result_tabs, 3)
         main_layout.addWidget(self.log_area, 1)
         
         self.setLayout(main_layout)
@@ -380,7 +743,7 @@ class WebsiteDownloaderWidget(QWidget):
             self.output_dir = dir_path
             self.output_input.setText(dir_path)
     
-    def start_download(self):
+    def start_download(self, resume=False):
         url = self.url_input.text().strip()
         output_dir = self.output_input.text().strip()
         
@@ -389,11 +752,21 @@ class WebsiteDownloaderWidget(QWidget):
             QMessageBox.warning(self, "输入错误", "请输入网站URL")
             return
         
+        if normalize_url(url) is None:
+            self.log(f"错误: 无效的网站URL: {url}")
+            QMessageBox.warning(self, "输入错误", "请输入有效的 http/https 网站URL")
+            return
+        
         if not output_dir:
             self.log("错误: 请选择输出目录")
             QMessageBox.warning(self, "输入错误", "请选择输出目录")
             return
         
+        if resume and not CrawlState.exists(output_dir):
+            self.log("错误: 输出目录中没有可以继续的下载进度")
+            QMessageBox.warning(self, "无法继续", "输出目录中没有可以继续的下载进度")
+            return
+        
         # 获取配置参数
         try:
             max_depth = int(self.depth_input.text().strip())
@@ -405,10 +778,29 @@ class WebsiteDownloaderWidget(QWidget):
         except ValueError:
             max_files = 500
         
+        try:
+            workers = int(self.workers_input.text().strip())
+        except ValueError:
+            workers = 8
+        
+        try:
+            per_host_connections = int(self.per_host_input.text().strip())
+        except ValueError:
+            per_host_connections = 6
+        
+        try:
+            max_query_variants = int(self.query_variants_input.text().strip())
+        except ValueError:
+            max_query_variants = 20
+        
         respect_robots = self.robots_check.isChecked()
         
         # 重置UI状态
-        self.file_tree.clear()
+        self.reset_file_tree()
+        self.findings_tree.clear()
+        self.findings_index.clear()
+        self.finding_items = []
+        self.result_tabs.setTabText(1, "敏感信息")
         self.log_area.clear()
         self.open_btn.setEnabled(False)
         self.progress_bar.setValue(0)
@@ -422,14 +814,25 @@ class WebsiteDownloaderWidget(QWidget):
             output_dir,
             max_depth,
             max_files,
-            respect_robots
+            respect_robots,
+            workers=workers,
+            per_host_connections=per_host_connections,
+            use_http_cache=self.http_cache_check.isChecked(),
+            use_blob_store=self.blob_store_check.isChecked(),
+            max_query_variants=max_query_variants,
+            resume=resume,
+            scan_sensitive=self.scan_check.isChecked(),
+            http2=self.http2_check.isChecked()
         )
         self.downloader.progress.connect(self.update_progress)
+        self.downloader.findings_found.connect(self.append_findings)
+        self.downloader.files_downloaded.connect(self.add_files)
         self.downloader.download_finished.connect(self.download_finished)
         self.downloader.error_occurred.connect(self.handle_error)
         
         # 更新按钮状态
         self.download_btn.setEnabled(False)
+        self.resume_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         
         # 开始下载
@@ -440,96 +843,111 @@ class WebsiteDownloaderWidget(QWidget):
             self.downloader.stop()
             self.log("下载已停止")
             self.download_btn.setEnabled(True)
+            self.resume_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
     
     def download_finished(self, result):
         # 更新按钮状态
         self.download_btn.setEnabled(True)
+        self.resume_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.open_btn.setEnabled(True)
         
-        # 显示文件树
-        self.display_files(result['files'])
-        
         # 更新状态
-        self.status_label.setText(f"下载完成! 共下载 {result['total_files']} 个文件")
-        
-    def display_files(self, files):
-        """在树形控件中显示文件结构"""
-        root_item = QTreeWidgetItem(self.file_tree, ["网站文件", "", "", ""])
-        root_item.setExpanded(True)
-        
-        # 按目录结构组织文件
-        dir_structure = {}
-        for file_info in files:
-            # 获取相对路径
-            rel_path = os.path.relpath(file_info['local_path'], self.output_input.text())
-            path_parts = os.path.normpath(rel_path).split(os.sep)
-            
-            current_level = dir_structure
-            for part in path_parts[:-1]:
-                if part not in current_level:
-                    current_level[part] = {}
-                current_level = current_level[part]
-        
-        # 递归添加节点
-        def add_tree_items(parent, structure, path=""):
-            for name, children in structure.items():
-                full_path = os.path.join(path, name) if path else name
-                node = QTreeWidgetItem(parent, [name, "目录", "", full_path])
-                node.setIcon(0, QIcon.fromTheme("folder"))
-                add_tree_items(node, children, full_path)
-        
-        add_tree_items(root_item, dir_structure)
-        
-        # 添加文件节点
-        for file_info in files:
-            # 获取相对路径
-            rel_path = os.path.relpath(file_info['local_path'], self.output_input.text())
-            path_parts = os.path.normpath(rel_path).split(os.sep)
-            parent = root_item
-            
-            for part in path_parts[:-1]:
-                found = False
-                for i in range(parent.childCount()):
-                    if parent.child(i).text(0) == part:
-                        parent = parent.child(i)
-                        found = True
-                        break
-                if not found:
-                    # 如果找不到路径，创建缺失的目录
-                    new_parent = QTreeWidgetItem(parent, [part, "目录", "", ""])
-                    new_parent.setIcon(0, QIcon.fromTheme("folder"))
-                    parent = new_parent
-                    found = True
-            
-            size_str = self.format_size(file_info['size'])
-            file_item = QTreeWidgetItem(parent, [
-                path_parts[-1],
-                file_info['type'],
-                size_str,
-                file_info['local_path']
-            ])
-            file_item.setData(0, Qt.UserRole, file_info['local_path'])  # 存储完整路径
-            
-            # 设置文件类型图标
-            if file_info['type'] == 'html':
-                file_item.setIcon(0, QIcon.fromTheme("text-html"))
-            elif file_info['type'] == 'css':
-                file_item.setIcon(0, QIcon.fromTheme("text-css"))
-            elif file_info['type'] == 'javascript':
-                file_item.setIcon(0, QIcon.fromTheme("text-x-script"))
-            elif file_info['type'] == 'image':
-                file_item.setIcon(0, QIcon.fromTheme("image-x-generic"))
-        
-        # 展开所有节点
-        self.expand_all_items(root_item)
+        self.status_label.setText(f"下载完成! 共下载 {result['total_files']} 个文件，其中 {result['unchanged_files']} 个未变化")
+        
+    def reset_file_tree(self):
+        """清空文件树，只保留根节点"""
+        self.file_tree.clear()
+        self.dir_items = {}
+        self.file_items = {}
+        self.tree_root = QTreeWidgetItem(self.file_tree, ["网站文件", "", "", ""])
+        self.tree_root.setExpanded(True)
+        self.dir_items[""] = self.tree_root
+    
+    def add_files(self, files):
+        """把新下载的一批文件加入文件树
+
+        目录节点按相对路径登记在字典中，查找父节点不必遍历兄弟节点；
+        插入期间暂停排序，整批插入后只排序一次。只展开根节点，其余目录由用户按需展开。
+        """
+        if self.tree_root is None:
+            self.reset_file_tree()
+        output_dir = self.output_input.text()
+        sorting = self.file_tree.isSortingEnabled()
+        self.file_tree.setSortingEnabled(False)
+        try:
+            for file_info in files:
+                self.add_file_item(file_info, output_dir)
+        finally:
+            self.file_tree.setSortingEnabled(sorting)
+    
+    def add_file_item(self, file_info, output_dir):
+        local_path = file_info['local_path']
+        size_str = self.format_size(file_info['size'])
+        item = self.file_items.get(local_path)
+        if item is not None:
+            # 同一文件再次出现（例如继续下载时恢复的文件）只更新信息
+            item.setText(1, file_info['type'])
+            item.setText(2, size_str)
+            return
+        
+        # 获取相对路径
+        rel_path = os.path.relpath(local_path, output_dir)
+        path_parts = os.path.normpath(rel_path).split(os.sep)
+        parent = self.dir_item(path_parts[:-1])
+        
+        file_item = QTreeWidgetItem(parent, [
+            path_parts[-1],
+            file_info['type'],
+            size_str,
+            local_path
+        ])
+        file_item.setData(0, Qt.UserRole, local_path)  # 存储完整路径
+        self.file_items[local_path] = file_item
+        
+        # 设置文件类型图标
+        if file_info['type'] == 'html':
+            file_item.setIcon(0, QIcon.fromTheme("text-html"))
+        elif file_info['type'] == 'css':
+            file_item.setIcon(0, QIcon.fromTheme("text-css"))
+        elif file_info['type'] == 'javascript':
+            file_item.setIcon(0, QIcon.fromTheme("text-x-script"))
+        elif file_info['type'] == 'image':
+            file_item.setIcon(0, QIcon.fromTheme("image-x-generic"))
     
-    def expand_all_items(self, item):
-        """递归展开所有树节点"""
-        item.setExpanded(True)
-        for i in range(item.childCount()):
-            self.expand_all_items(item.child(i))
+    def dir_item(self, parts):
+        """返回目录节点，缺失的各级目录依次创建"""
+        key = "/".join(parts)
+        item = self.dir_items.get(key)
+        if item is not None:
+            return item
+        parent = self.dir_item(parts[:-1])
+        item = QTreeWidgetItem(parent, [parts[-1], "目录", "", os.path.join(*parts)])
+        item.setIcon(0, QIcon.fromTheme("folder"))
+        self.dir_items[key] = item
+        return item
+    
+    def append_findings(self, findings):
+        """聚合新结果：新出现的密钥追加一行，已有的密钥只更新次数"""
+        added, updated = self.findings_index.add(findings)
+        for group in added:
+            finding = self.findings_index.groups[group]
+            item = QTreeWidgetItem(self.findings_tree, [
+                finding["type"],
+                finding["severity"],
+                finding["match"],
+                str(self.findings_index.count(group)),
+                finding["file"],
+                finding.get("url", "")
+            ])
+            item.setData(0, Qt.UserRole, finding["file"])
+            if finding["severity"] in ("critical", "high"):
+                item.setForeground(1, QBrush(QColor("red")))
+            self.finding_items.append(item)
+        for group in updated:
+            self.finding_items[group].setText(3, str(self.findings_index.count(group)))
+        self.result_tabs.setTabText(1, f"敏感信息 ({len(self.findings_index)})")
     
     def show_file_context_menu(self, position):
         """显示文件右键菜单"""
@@ -605,11 +1023,7 @@ class WebsiteDownloaderWidget(QWidget):
     
     def format_size(self, size):
         """格式化文件大小"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} GB"
+        return WebsiteDownloaderThread.format_size(size)
     
     def update_progress(self, progress, message, files_count, visited_count):
         self.progress_bar.setValue(progress)
@@ -622,6 +1036,7 @@ class WebsiteDownloaderWidget(QWidget):
         self.status_label.setText(error_msg)
         QMessageBox.critical(self, "下载错误", error_msg)
         self.download_btn.setEnabled(True)
+        self.resume_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.log(f"错误: {error_msg}")
     
@@ -1,212 +1,679 @@
 import os
-import re
 import json
 import time
+import bisect
+import mmap
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
-    QPushButton, QFileDialog, QTreeWidget, QTreeWidgetItem,
+    QPushButton, QFileDialog, QTreeView, QComboBox,
     QTextEdit, QSplitter, QProgressBar, QMessageBox, QGroupBox, 
     QCheckBox, QMenu, QApplication, QHeaderView, QTabWidget
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QAbstractItemModel, QModelIndex
 from PyQt5.QtGui import QIcon, QBrush, QColor
 from plugins.base_plugin import BasePlugin
+from core.sensitive_engine import SensitivePatternEngine, secret_fingerprint, MAX_MATCH_LENGTH
+from core.sensitive_rules import default_patterns
+from core.scan_cache import ScanCache, hash_file, hash_bytes
+from core.utils import get_cache_dir
+from core.file_walker import ParallelFileWalker
+from core.content_sniffer import SNIFF_SIZE, bom_encoding, decode_text, is_binary, printable_bytes
+from core.archive_scanner import ArchiveScanner, is_archive
+from core.rule_pack import compile_rule_pack
+from core.findings_store import FindingsSink, FindingsIndex, new_sink_path, iter_sink
+from core.findings_export import export_findings, export_format
+from core.git_history import GitRepository, GitError, find_git_dir
+from core.finding_context import ContextResolver
 
 class SensitiveInfoScannerThread(QThread):
     progress = pyqtSignal(int, str)
-    scan_finished = pyqtSignal(list)
+    results_found = pyqtSignal(list)   # 扫描过程中分批发送的结果
+    scan_finished = pyqtSignal(dict)   # 扫描结束时的汇总信息
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, scan_dir, file_extensions, max_file_size, exclude_dirs=None):
+    # 结果攒够一批或距上次发送超过一定时间后发送给界面并写入磁盘
+    BATCH_SIZE = 200
+    BATCH_INTERVAL = 0.5
+    
+    # 扫描 git 历史时并行读取和扫描 blob 的线程数
+    GIT_WORKERS = 4
+    
+    # 结果中保存的匹配内容的最大长度（指纹按完整的匹配计算）
+    MAX_MATCH_LENGTH = MAX_MATCH_LENGTH
+
+    def __init__(self, scan_dir, file_extensions, max_file_size, exclude_dirs=None, scan_large_files=True,
+                 use_cache=True, cache_path=None, binary_strings=False, scan_archives=True,
+                 rule_packs=None, sink_path=None, git_history=False):
         super().__init__()
         self.scan_dir = scan_dir
         self.file_extensions = file_extensions
         self.max_file_size = max_file_size * 1024 * 1024  # 转换为字节
+        self.scan_large_files = scan_large_files  # 超过大小限制的文件改用分块方式扫描，而不是跳过
         self.exclude_dirs = exclude_dirs or ['.git', 'node_modules', 'vendor', '__pycache__']
         self.results = []
         self.running = True
         self.patterns = self.get_sensitive_patterns()
+        self.engine = SensitivePatternEngine(self.patterns)
+        self.use_cache = use_cache  # 增量扫描：未变化的文件直接复用上次的结果
+        self.cache_path = cache_path or os.path.join(get_cache_dir(), "sensitive_scan.db")
+        self.cache = None
+        self.binary_strings = binary_strings  # 二进制文件：True 提取可打印字符串扫描，False 直接跳过
+        self.skipped_binary = 0
+        self.scan_archives = scan_archives  # 在内存中扫描 zip/jar/war/apk/tar 等压缩包内的文件
+        self.skipped_archive_members = 0
+        self.rule_packs = rule_packs or []  # 额外加载的规则包文件（YAML/JSON）
+        self.sink_path = sink_path or new_sink_path()
+        self.sink = None
+        self.git_history = git_history  # 扫描 git 历史中的全部文件版本，而不是工作目录
+        self.skipped_large = 0
+        self.skipped_lock = threading.Lock()  # 跳过计数会在压缩包和 git 扫描的线程池中更新
+        self.pending_results = []
+        self.last_flush = 0
+        self.total_results = 0
+
+    def count_skipped(self, counter, amount=1):
+        """线程安全地增加一个跳过计数（skipped_binary / skipped_large / skipped_archive_members）"""
+        with self.skipped_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
 
     def get_sensitive_patterns(self):
-        """定义敏感信息模式的正则表达式"""
-        return [
-            # API密钥和令牌 - 增加上下文要求
-            {"name": "API Key", "pattern": r'(?i)(?:api[_-]?key|access[_-]?key|secret[_-]?key)[\s=:]+["\']([0-9a-zA-Z\-_]{10,50})["\']', "severity": "high"},
-            {"name": "App Secret", "pattern": r'(?i)(?:app[_-]?secret|client[_-]?secret)[\s=:]+["\']([0-9a-zA-Z\-_]{10,50})["\']', "severity": "critical"},
-            {"name": "Bearer Token", "pattern": r'(?i)bearer[\s]+([a-zA-Z0-9\-_]{20,100})', "severity": "critical"},
-            {"name": "JWT Token", "pattern": r'\beyJ[A-Za-z0-9-_=]+\.[A-Za-z0-9-_=]+\.?[A-Za-z0-9-_.+/=]*\b', "severity": "high"},
-            
-            # 密码 - 增加上下文要求
-            {"name": "Password", "pattern": r'(?i)(?:password|passwd|pwd)[\s=:]+["\']([^"\'\s]{8,50})["\']', "severity": "critical"},
-            {"name": "Password in Config", "pattern": r'(?i)<password>([^<]{8,50})</password>', "severity": "critical"},
-            
-            # 认证信息 - 增加上下文要求
-            {"name": "Basic Auth", "pattern": r'(?i)authorization:\s*basic\s+([a-zA-Z0-9=+/]{20,})', "severity": "high"},
-            
-            # 数据库连接字符串 - 增加上下文要求
-            {"name": "Database Connection", "pattern": r'(?i)(?:postgresql|mysql|mongodb|sqlserver)://[a-zA-Z0-9_]+:([^@\s]{8,50})@[a-zA-Z0-9.\-_]+', "severity": "critical"},
-            
-            # 云服务凭证 - 增加前缀和上下文要求
-            {"name": "AWS Access Key", "pattern": r'(?i)(?:aws[_-]?access[_-]?key|aws[_-]?key)[\s=:]+["\']?(AKIA[0-9A-Z]{16})["\']?', "severity": "critical"},
-            {"name": "AWS Secret Key", "pattern": r'(?i)(?:aws[_-]?secret[_-]?access[_-]?key|aws[_-]?secret[_-]?key)[\s=:]+["\']([0-9a-zA-Z/+]{40})["\']', "severity": "critical"},
-            {"name": "Google API Key", "pattern": r'(?i)(?:google[_-]?api[_-]?key|gcp[_-]?key)[\s=:]+["\']?(AIza[0-9A-Za-z\-_]{35})["\']?', "severity": "high"},
-            {"name": "Google Cloud Key", "pattern": r'(?i)(?:google[_-]?cloud[_-]?key|gcp[_-]?service[_-]?key)[\s=:]+["\']?(GOOG[0-9A-Za-z\-_]{10,30})["\']?', "severity": "high"},
-            {"name": "Azure Key", "pattern": r'(?i)(?:azure[_-]?key|microsoft[_-]?azure[_-]?key)[\s=:]+["\']?(AZ[0-9A-Za-z\-_]{34,40})["\']?', "severity": "high"},
-            {"name": "IBM Cloud Key", "pattern": r'(?i)(?:ibm[_-]?cloud[_-]?key|bluemix[_-]?key)[\s=:]+["\']?(IBM[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high"},
-            {"name": "Oracle Cloud Key", "pattern": r'(?i)(?:oracle[_-]?cloud[_-]?key|oci[_-]?key)[\s=:]+["\']?(OCID[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high"},
-            {"name": "Alibaba Cloud Key", "pattern": r'(?i)(?:alibaba[_-]?cloud[_-]?key|aliyun[_-]?key)[\s=:]+["\']?(LTAI[0-9A-Za-z\-_]{12,20})["\']?', "severity": "high"},
-            {"name": "Tencent Cloud Key", "pattern": r'(?i)(?:tencent[_-]?cloud[_-]?key|qcloud[_-]?key)[\s=:]+["\']?(AKID[0-9A-Za-z\-_]{13,20})["\']?', "severity": "high"},
-            {"name": "Huawei Cloud Key", "pattern": r'(?i)(?:huawei[_-]?cloud[_-]?key|hwcloud[_-]?key)[\s=:]+["\']?(AK[0-9A-Za-z\-_]{10,62})["\']?', "severity": "high"},
-            {"name": "Baidu Cloud Key", "pattern": r'(?i)(?:baidu[_-]?cloud[_-]?key|bce[_-]?key)[\s=:]+["\']?(AK[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high"},
-            {"name": "JD Cloud Key", "pattern": r'(?i)(?:jd[_-]?cloud[_-]?key|jdcloud[_-]?key)[\s=:]+["\']?(JDC_[A-Z0-9]{28,32})["\']?', "severity": "high"},
-            {"name": "Volcano Engine Key", "pattern": r'(?i)(?:volcano[_-]?engine[_-]?key|byteplus[_-]?key)[\s=:]+["\']?(AKLT[0-9A-Za-z\-_]{0,252})["\']?', "severity": "high"},
-            {"name": "UCloud Key", "pattern": r'(?i)(?:ucloud[_-]?key)[\s=:]+["\']?(UC[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high"},
-            {"name": "China Unicom Cloud Key", "pattern": r'(?i)(?:unicom[_-]?cloud[_-]?key|cucloud[_-]?key)[\s=:]+["\']?(LTC[0-9A-Za-z\-_]{10,60})["\']?', "severity": "high"},
-            {"name": "China Mobile Cloud Key", "pattern": r'(?i)(?:mobile[_-]?cloud[_-]?key|cmcloud[_-]?key)[\s=:]+["\']?(YD[0-9A-Za-z\-_]{10,60})["\']?', "severity": "high"},
-            {"name": "China Telecom Cloud Key", "pattern": r'(?i)(?:telecom[_-]?cloud[_-]?key|ctcloud[_-]?key)[\s=:]+["\']?(CTC[0-9A-Za-z\-_]{10,60})["\']?', "severity": "high"},
-            {"name": "Yonyou Cloud Key", "pattern": r'(?i)(?:yonyou[_-]?cloud[_-]?key|yycloud[_-]?key)[\s=:]+["\']?(YY[0-9A-Za-z\-_]{10,40})["\']?', "severity": "high"},
-            
-            # 个人身份信息 - 增加边界检查
-            {"name": "Email Address", "pattern": r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b', "severity": "medium"},
-            {"name": "Credit Card", "pattern": r'\b(?:\d[ -]*?){13,16}\b', "severity": "high"},
-            {"name": "SSN", "pattern": r'\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b', "severity": "high"},
-            {"name": "Phone Number", "pattern": r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b', "severity": "medium"},
-            
-            # 其他敏感信息 - 增加上下文要求
-            {"name": "Private Key", "pattern": r'-----BEGIN (?:RSA|DSA|EC|OPENSSH) PRIVATE KEY-----', "severity": "critical"},
-            {"name": "License Key", "pattern": r'(?i)(?:license|licence|serial)[_-]?key[\s=:]+["\']?([0-9a-zA-Z\-_]{10,30})["\']?', "severity": "medium"},
-            {"name": "Sensitive URL", "pattern": r'(?i)(?:admin|login|private|secret)[^\s/]*\.(?:php|asp|aspx|jsp|html)', "severity": "medium"},
-            
-            # 通用密钥模式 - 增加上下文要求
-            {"name": "Generic Key Pattern", "pattern": r'(?i)(?:access[_-]?key|secret[_-]?key|api[_-]?key|client[_-]?secret|app[_-]?secret)[\s=:]+["\']?([0-9a-zA-Z\-_+=/]{10,100})["\']?', "severity": "high"},
-            
-            # 配置文件中的敏感信息 - 增加上下文要求
-            {"name": "Config Secret", "pattern": r'(?i)(?:password|passwd|pwd|secret|key|token)[\s=:]+["\']?([^"\'\s]{8,50})["\']?', "severity": "medium"},
-        ]
+        """定义敏感信息模式的正则表达式（内置规则见 core.sensitive_rules）"""
+        return default_patterns()
 
     def run(self):
         try:
             if not os.path.exists(self.scan_dir):
                 raise FileNotFoundError(f"目录不存在: {self.scan_dir}")
             
+            self.load_rule_packs()
             self.progress.emit(0, "正在扫描文件...")
             
-            # 收集所有要扫描的文件
-            file_paths = []
-            for root, dirs, files in os.walk(self.scan_dir):
-                if not self.running:
-                    self.progress.emit(0, "扫描已中止")
-                    return
-                
-                # 排除不需要的目录
-                dirs[:] = [d for d in dirs if d not in self.exclude_dirs]
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    
-                    # 检查文件扩展名
-                    if self.file_extensions:
-                        ext = os.path.splitext(file)[1].lower()
-                        if ext not in self.file_extensions:
-                            continue
-                    
-                    # 检查文件大小
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        if file_size > self.max_file_size:
-                            self.progress.emit(0, f"跳过大文件: {file} ({file_size//1024}KB)")
-                            continue
-                    except Exception:
-                        continue
-                    
-                    file_paths.append(file_path)
+            # 结果边扫描边写入磁盘，中途停止时已发现的结果不会丢失
+            self.sink = FindingsSink(self.sink_path)
+            self.last_flush = time.monotonic()
             
-            total_files = len(file_paths)
-            if total_files == 0:
-                self.progress.emit(100, "没有找到可扫描的文件")
-                self.scan_finished.emit([])
+            if self.use_cache:
+                # 二进制文件和压缩包的处理方式也会影响扫描结果，一并计入缓存版本：
+                # 压缩包中扫描哪些成员取决于扩展名列表，成员和 git 历史中文件版本的大小上限取决于 max_file_size
+                binary_mode = "strings" if self.binary_strings else "skip"
+                archive_mode = "plain"
+                if self.scan_archives:
+                    extensions = ",".join(sorted({ext.lower() for ext in self.file_extensions or ()}))
+                    archive_mode = f"archives[{extensions}]"
+                size_mode = "all" if self.scan_large_files and not self.scan_archives else str(self.max_file_size)
+                self.cache = ScanCache(
+                    self.cache_path, f"{self.engine.version}:{binary_mode}:{archive_mode}:{size_mode}"
+                )
+            
+            if self.git_history:
+                self.scan_git_history()
                 return
             
+            # 边遍历边扫描：遍历线程在后台过滤文件并放入有界队列
+            # 启用压缩包扫描时，压缩包不受扩展名过滤限制（其中的成员仍按扩展名过滤）；
+            # 按完整文件名判断，.gz/.bz2/.xz 只有 .tar.gz 等形式才算压缩包
+            walker = ParallelFileWalker(
+                self.scan_dir,
+                file_extensions=self.file_extensions,
+                exclude_dirs=self.exclude_dirs,
+                max_file_size=None if self.scan_large_files else self.max_file_size,
+                name_filter=is_archive if self.scan_archives else None
+            )
+            walker.start()
+            
             # 扫描文件
-            results = []
-            for idx, file_path in enumerate(file_paths):
+            scanned = 0
+            last_progress = -1
+            for file_path, file_size, mtime_ns in walker:
                 if not self.running:
+                    walker.stop()
+                    self.flush_results()
                     self.progress.emit(0, "扫描已中止")
+                    self.emit_finished(scanned, stopped=True)
                     return
                 
+                scanned += 1
                 try:
-                    # 更新进度
-                    progress = int((idx + 1) / total_files * 100)
-                    self.progress.emit(progress, f"扫描中: {os.path.basename(file_path)}")
+                    # 更新进度（遍历尚未结束时总数仍在增长；百分比变化时才发送，避免信号堆积）
+                    progress = int(scanned / max(walker.discovered, scanned) * 100)
+                    if progress != last_progress:
+                        last_progress = progress
+                        self.progress.emit(progress, f"扫描中: {os.path.basename(file_path)}")
                     
-                    # 扫描文件
-                    file_results = self.scan_file(file_path)
+                    if self.cache:
+                        file_results = self.scan_with_cache(file_path, file_size, mtime_ns)
+                    else:
+                        file_results = self.scan_path(file_path, file_size)
                     if file_results:
-                        results.extend(file_results)
+                        self.add_results(file_results)
                 except Exception as e:
                     self.progress.emit(progress, f"扫描文件出错: {file_path} - {str(e)}")
             
-            self.scan_finished.emit(results)
-            self.progress.emit(100, f"扫描完成! 发现 {len(results)} 条敏感信息")
+            if walker.skipped_large:
+                self.progress.emit(100, f"已跳过 {walker.skipped_large} 个超过大小限制的文件")
+            if self.skipped_binary:
+                self.progress.emit(100, f"已跳过 {self.skipped_binary} 个二进制文件")
+            if self.skipped_archive_members:
+                self.progress.emit(100, f"已跳过 {self.skipped_archive_members} 个超出大小或嵌套层数限制、加密或损坏的压缩包成员")
+            
+            self.flush_results()
+            if scanned == 0:
+                self.progress.emit(100, "没有找到可扫描的文件")
+                self.emit_finished(scanned)
+                return
+            
+            self.emit_finished(scanned)
+            self.progress.emit(100, f"扫描完成! 发现 {self.total_results} 条敏感信息")
             
         except Exception as e:
             error_msg = f"扫描出错: {str(e)}"
             self.progress.emit(0, error_msg)
             self.error_occurred.emit(error_msg)
+        finally:
+            if self.cache:
+                self.cache.close()
+                self.cache = None
+            if self.sink:
+                self.sink.close()
+
+    def add_results(self, results):
+        """暂存结果，攒够一批或超过发送间隔时统一发送"""
+        self.pending_results.extend(results)
+        if (len(self.pending_results) >= self.BATCH_SIZE
+                or time.monotonic() - self.last_flush >= self.BATCH_INTERVAL):
+            self.flush_results()
+
+    def flush_results(self):
+        """把暂存的结果写入磁盘并发送给界面"""
+        self.last_flush = time.monotonic()
+        if not self.pending_results:
+            return
+        batch = self.pending_results
+        self.pending_results = []
+        self.sink.write(batch)
+        self.total_results += len(batch)
+        self.results_found.emit(batch)
+
+    def emit_finished(self, scanned, stopped=False):
+        self.scan_finished.emit({
+            "total": self.total_results,
+            "scanned_files": scanned,
+            "sink_path": self.sink_path,
+            "stopped": stopped
+        })
+
+    def scan_git_history(self):
+        """扫描 git 历史中所有提交的全部文件版本
+
+        直接读取 .git 中的对象，每个不同的 blob 只扫描一次（历史中未变化的文件不会重复扫描），
+        结果记录该 blob 首次出现的提交和路径。blob 的解压和扫描由线程池并行完成，
+        缓存以 blob id 为键，重复扫描同一仓库时只扫描新增的 blob。
+        """
+        git_dir = find_git_dir(self.scan_dir)
+        if not git_dir:
+            raise GitError(f"不是 git 仓库: {self.scan_dir}")
+        
+        self.progress.emit(0, "正在读取提交历史...")
+        repo = GitRepository(git_dir)
+        pool = ThreadPoolExecutor(max_workers=self.GIT_WORKERS)
+        # (future, 缓存的结果)，按 blob 首次出现的顺序输出结果，缓存命中的 blob 也排在队列中等待
+        pending = deque()
+        scanned = 0
+        try:
+            blobs = repo.iter_blobs(
+                should_stop=lambda: not self.running,
+                accept_dir=self.accept_git_dir,
+                accept_file=self.accept_git_path
+            )
+            for oid, commit, path in blobs:
+                scanned += 1
+                if scanned % 100 == 0:
+                    self.progress.emit(0, f"扫描历史: 已扫描 {scanned} 个文件版本 - {path}")
+                
+                # 缓存只在当前线程中访问
+                cache_key = f"git:{oid.hex()}"
+                if self.cache:
+                    results = self.cache.lookup(cache_key, 0, 0)
+                    if results is not None:
+                        if results:
+                            pending.append((None, results))
+                        continue
+                
+                pending.append((pool.submit(self.scan_git_blob, repo, oid, commit, path), None))
+                if len(pending) >= self.GIT_WORKERS * 4:
+                    self.collect_git_blob(*pending.popleft())
+            
+            while pending and self.running:
+                self.collect_git_blob(*pending.popleft())
+        finally:
+            # 停止时取消尚未开始的扫描（shutdown 的 cancel_futures 参数需要 Python 3.9）
+            for future, _ in pending:
+                if future is not None:
+                    future.cancel()
+            pool.shutdown(wait=True)
+            repo.close()
+        
+        if self.skipped_large:
+            self.progress.emit(100, f"已跳过 {self.skipped_large} 个超过大小限制的文件版本")
+        if self.skipped_binary:
+            self.progress.emit(100, f"已跳过 {self.skipped_binary} 个二进制文件版本")
+        
+        self.flush_results()
+        if not self.running:
+            self.progress.emit(0, "扫描已中止")
+            self.emit_finished(scanned, stopped=True)
+            return
+        self.emit_finished(scanned)
+        self.progress.emit(100, f"扫描完成! 在 {scanned} 个历史文件版本中发现 {self.total_results} 条敏感信息")
+
+    def accept_git_dir(self, path):
+        """历史中被排除的目录（例如 node_modules）在遍历时不展开"""
+        return path.rsplit('/', 1)[-1] not in self.exclude_dirs
+
+    def accept_git_path(self, path):
+        """历史中的文件与工作目录使用同样的扩展名和排除目录过滤"""
+        parts = path.split('/')
+        if any(part in self.exclude_dirs for part in parts[:-1]):
+            return False
+        if self.scan_archives and is_archive(path):
+            return True
+        return self.accept_archive_member(path)
+
+    def scan_git_blob(self, repo, oid, commit, path):
+        """在线程池中读取并扫描一个 blob，返回 (blob id, 结果列表)"""
+        if not self.running:
+            return oid, None
+        data = repo.read_blob(oid)
+        display_path = f"{commit.hex()[:10]}:{path}"
+        
+        if self.scan_archives and is_archive(path):
+            results = self.scan_archive(display_path, data)
+        elif len(data) > self.max_file_size and not self.scan_large_files:
+            self.count_skipped('skipped_large')
+            return oid, []
+        else:
+            results = self.scan_data(display_path, data)
+        
+        for result in results:
+            result["commit"] = commit.hex()
+            result["blob"] = oid.hex()
+        return oid, results
+
+    def collect_git_blob(self, future, cached=None):
+        if future is None:
+            self.add_results(cached)
+            return
+        try:
+            oid, results = future.result()
+        except Exception as e:
+            self.progress.emit(0, f"读取 git 对象出错: {str(e)}")
+            return
+        if results is None:
+            return
+        # 中途停止时结果可能不完整，不写入缓存
+        if self.cache and self.running:
+            self.cache.store(f"git:{oid.hex()}", 0, 0, oid.hex(), results)
+        if results:
+            self.add_results(results)
+
+    def load_rule_packs(self):
+        """编译规则包（结果按内容哈希缓存在磁盘上），与内置规则合并后重建匹配引擎"""
+        if not self.rule_packs:
+            return
+        
+        patterns = list(self.patterns)
+        seen = {pattern["pattern"] for pattern in patterns}
+        for pack_path in self.rule_packs:
+            self.progress.emit(0, f"正在加载规则包: {os.path.basename(pack_path)}")
+            rules, warnings = compile_rule_pack(pack_path)
+            for warning in warnings:
+                self.progress.emit(0, f"规则包警告: {warning}")
+            for rule in rules:
+                if rule["pattern"] not in seen:
+                    seen.add(rule["pattern"])
+                    patterns.append(rule)
+        
+        self.patterns = patterns
+        self.engine = SensitivePatternEngine(patterns)
+        self.progress.emit(0, f"已加载 {len(patterns)} 条规则")
+
+    def scan_path(self, file_path, file_size, data=None):
+        """扫描单个文件：压缩包在内存中展开扫描，先识别二进制文件，大文件使用内存映射分块扫描"""
+        if self.scan_archives and is_archive(file_path):
+            return self.scan_archive(file_path, data)
+        
+        if file_size > self.max_file_size:
+            with open(file_path, 'rb') as f:
+                head = f.read(SNIFF_SIZE)
+            if is_binary(head):
+                # 大型二进制文件不做字符串提取，直接跳过
+                self.count_skipped('skipped_binary')
+                return []
+            if bom_encoding(head):
+                # 分块扫描按字节匹配，UTF-16/UTF-32 文本需要整体解码后再扫描
+                return self.scan_file(file_path)
+            return self.scan_large_file(file_path)
+        
+        if data is None:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        return self.scan_data(file_path, data)
+
+    def scan_data(self, file_path, data):
+        """扫描已读入内存的内容：二进制内容按设置提取字符串或跳过"""
+        if is_binary(data[:SNIFF_SIZE]):
+            if self.binary_strings:
+                return self.scan_binary_strings(file_path, data)
+            self.count_skipped('skipped_binary')
+            return []
+        return self.scan_file(file_path, data)
+
+    def scan_archive(self, file_path, data=None):
+        """在内存中扫描压缩包内的文件（支持嵌套压缩包），结果中的路径形如 app.jar!/config.properties"""
+        scanner = ArchiveScanner(
+            self.scan_data,
+            member_filter=self.accept_archive_member,
+            should_stop=lambda: not self.running,
+            max_member_size=self.max_file_size
+        )
+        try:
+            results = scanner.scan(data if data is not None else file_path, file_path)
+        except Exception as e:
+            self.progress.emit(0, f"读取压缩包出错: {file_path} - {str(e)}")
+            return []
+        
+        self.count_skipped('skipped_archive_members', scanner.skipped)
+        return results
+
+    def accept_archive_member(self, name):
+        """压缩包成员与普通文件使用同样的扩展名过滤"""
+        if not self.file_extensions:
+            return True
+        return os.path.splitext(name)[1].lower() in self.file_extensions
 
-    def scan_file(self, file_path):
-        """扫描单个文件中的敏感信息"""
+    def scan_with_cache(self, file_path, file_size, mtime_ns):
+        """优先复用指纹缓存中的结果，只有内容发生变化的文件才会重新扫描"""
+        results = self.cache.lookup(file_path, file_size, mtime_ns)
+        if results is not None:
+            return results
+        
+        # 小文件只读取一次，同时用于计算哈希和扫描
+        data = None
+        if file_size > self.max_file_size:
+            content_hash = hash_file(file_path)
+        else:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            content_hash = hash_bytes(data)
+        
+        results = self.cache.lookup_hash(file_path, content_hash, file_size, mtime_ns)
+        if results is not None:
+            return results
+        results = self.cache.lookup_content(file_path, content_hash, file_size, mtime_ns)
+        if results is not None:
+            return results
+        
+        results = self.scan_path(file_path, file_size, data)
+        
+        # 中途停止时结果不完整，不写入缓存
+        if self.running:
+            self.cache.store(file_path, file_size, mtime_ns, content_hash, results)
+        return results
+
+    def scan_file(self, file_path, data=None):
+        """扫描单个文件中的敏感信息（data 为已读取的文件内容时不再重复读取）"""
         results = []
         
         try:
             # 读取文件内容
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            if data is None:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+            content = decode_text(data)
             
-            # 应用所有正则模式
-            for pattern in self.patterns:
-                matches = re.finditer(pattern["pattern"], content)
-                for match in matches:
-                    # 获取匹配的上下文
-                    start = max(0, match.start() - 50)
-                    end = min(len(content), match.end() + 50)
-                    context = content[start:end].replace('\n', ' ').replace('\r', ' ')
-                    
-                    result = {
-                        "file": file_path,
-                        "type": pattern["name"],
-                        "severity": pattern["severity"],
-                        "match": match.group(0),
-                        "line": self.get_line_number(content, match.start()),
-                        "context": context
-                    }
-                    results.append(result)
-                    
-                    if not self.running:
-                        return results
+            # 应用预编译的正则模式（锚点未命中的规则会被跳过）
+            for result in self.engine.iter_findings(file_path, content, self.MAX_MATCH_LENGTH):
+                results.append(result)
+                
+                if not self.running:
+                    return results
             
         except Exception as e:
             self.progress.emit(0, f"扫描文件出错: {file_path} - {str(e)}")
         
         return results
 
-    def get_line_number(self, content, position):
-        """获取匹配位置的行号"""
-        line_count = 1
-        current_pos = 0
+    def scan_large_file(self, file_path):
+        """以内存映射+重叠窗口的方式扫描大文件，内存占用与文件大小无关"""
+        results = []
+        
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return results
+                
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    for pattern, match, line, column in self.engine.iter_buffer_matches(buffer):
+                        results.append({
+                            "file": file_path,
+                            "type": pattern["name"],
+                            "severity": pattern["severity"],
+                            "match": match.group(0)[:self.MAX_MATCH_LENGTH].decode('utf-8', errors='ignore'),
+                            "line": line,
+                            "column": column,
+                            "fingerprint": secret_fingerprint(pattern, match)
+                        })
+                        
+                        if not self.running:
+                            break
+        
+        except Exception as e:
+            self.progress.emit(0, f"扫描文件出错: {file_path} - {str(e)}")
+        
+        return results
+
+    def scan_binary_strings(self, file_path, data):
+        """扫描二进制文件中的可打印字符串（不可打印字节替换为空格，偏移保持不变）"""
+        results = []
+        buffer = printable_bytes(data)
         
-        for char in content:
-            if current_pos >= position:
-                return line_count
-            if char == '\n':
-                line_count += 1
-            current_pos += 1
+        for pattern, match, line, column in self.engine.iter_buffer_matches(buffer):
+            results.append({
+                "file": file_path,
+                "type": pattern["name"],
+                "severity": pattern["severity"],
+                "match": match.group(0)[:self.MAX_MATCH_LENGTH].decode('ascii'),
+                "line": line,
+                "column": column,
+                "fingerprint": secret_fingerprint(pattern, match)
+            })
+            
+            if not self.running:
+                break
         
-        return line_count
+        return results
 
     def stop(self):
         self.running = False
 
+class FindingsModel(QAbstractItemModel):
+    """扫描结果的惰性数据模型
+
+    数据直接取自 FindingsIndex，模型本身只保存当前可见分组的编号列表，
+    视图需要显示哪一行时才从分组中取出对应的字段，不再为每条结果创建界面节点。
+    过滤和排序都只在编号列表上进行。
+    """
+
+    HEADERS = ["文件", "类型", "严重性", "匹配内容", "行号", "次数"]
+    COUNT_COLUMN = 5
+    SEVERITY_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+    SEVERITY_COLORS = {
+        "critical": QColor(255, 200, 200),
+        "high": QColor(255, 225, 200),
+        "medium": QColor(255, 255, 200),
+    }
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.findings = index
+        self.rows = []              # 当前可见的分组编号，按排序顺序排列
+        self.types = []             # 出现过的类型，按首次出现的顺序
+        self.severity_filter = None
+        self.type_filter = None
+        self.file_filter = ""
+        self.sort_column = 2
+        self.sort_order = Qt.AscendingOrder
+
+    # ---- QAbstractItemModel 接口 ----
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self.rows) or not 0 <= column < len(self.HEADERS):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        group = self.rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            result = self.findings.groups[group]
+            if column == 0:
+                return os.path.basename(result["file"])
+            if column == 1:
+                return result["type"]
+            if column == 2:
+                return result["severity"].capitalize()
+            if column == 3:
+                return result["match"][:50] + ("..." if len(result["match"]) > 50 else "")
+            if column == 4:
+                return str(result["line"])
+            return str(self.findings.count(group))
+        if role == Qt.BackgroundRole and column == 2:
+            color = self.SEVERITY_COLORS.get(self.findings.groups[group]["severity"])
+            return QBrush(color) if color else None
+        if role == Qt.ToolTipRole and column == 0:
+            return self.findings.groups[group]["file"]
+        if role == Qt.UserRole:
+            return group
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        groups = [self.rows[index.row()] for index in persistent]
+        self.rows.sort(key=self.sort_key, reverse=order == Qt.DescendingOrder)
+        positions = {group: row for row, group in enumerate(self.rows)}
+        self.changePersistentIndexList(
+            persistent, [self.createIndex(positions[group], index.column()) for group, index in zip(groups, persistent)]
+        )
+        self.layoutChanged.emit()
+
+    # ---- 数据更新 ----
+
+    def sort_key(self, group):
+        result = self.findings.groups[group]
+        column = self.sort_column
+        if column == 0:
+            return os.path.basename(result["file"]).lower(), group
+        if column == 1:
+            return result["type"], group
+        if column == 2:
+            return self.SEVERITY_ORDER.get(result["severity"], len(self.SEVERITY_ORDER)), group
+        if column == 3:
+            return result["match"], group
+        if column == 4:
+            return result["line"], group
+        return self.findings.count(group), group
+
+    def accepts(self, group):
+        result = self.findings.groups[group]
+        if self.severity_filter and result["severity"] != self.severity_filter:
+            return False
+        if self.type_filter and result["type"] != self.type_filter:
+            return False
+        if self.file_filter and self.file_filter not in result["file"].lower():
+            return False
+        return True
+
+    def add_groups(self, added, updated):
+        """索引中新增或更新了分组后调用，返回新出现的类型列表"""
+        known = set(self.types)
+        new_types = []
+        for group in added:
+            kind = self.findings.groups[group]["type"]
+            if kind not in known:
+                known.add(kind)
+                new_types.append(kind)
+        self.types.extend(new_types)
+
+        reverse = self.sort_order == Qt.DescendingOrder
+        keys = None
+        for group in added:
+            if not self.accepts(group):
+                continue
+            # 新分组按当前排序插入到对应位置，已显示的行保持不动
+            if keys is None:
+                keys = [self.sort_key(row) for row in self.rows]
+                if reverse:
+                    keys.reverse()
+            key = self.sort_key(group)
+            position = bisect.bisect_right(keys, key)
+            keys.insert(position, key)
+            row = len(self.rows) - position if reverse else position
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.rows.insert(row, group)
+            self.endInsertRows()
+
+        if updated and self.rows:
+            if self.sort_column == self.COUNT_COLUMN:
+                self.sort(self.sort_column, self.sort_order)
+            else:
+                self.dataChanged.emit(
+                    self.createIndex(0, self.COUNT_COLUMN),
+                    self.createIndex(len(self.rows) - 1, self.COUNT_COLUMN)
+                )
+        return new_types
+
+    def set_filter(self, severity=None, kind=None, file_text=""):
+        """按严重性、类型和文件路径（不区分大小写的子串）过滤"""
+        self.severity_filter = severity
+        self.type_filter = kind
+        self.file_filter = file_text.lower()
+        self.beginResetModel()
+        self.rows = [group for group in range(len(self.findings)) if self.accepts(group)]
+        self.rows.sort(key=self.sort_key, reverse=self.sort_order == Qt.DescendingOrder)
+        self.endResetModel()
+
+    def reset(self):
+        self.beginResetModel()
+        self.rows = []
+        self.types = []
+        self.endResetModel()
+
+    def group_at(self, index):
+        return self.rows[index.row()] if index.isValid() else None
+
 class SensitiveInfoScannerPlugin(BasePlugin):
     def __init__(self):
         super().__init__()
@@ -225,12 +692,18 @@ class SensitiveInfoScannerPlugin(BasePlugin):
         return SensitiveInfoScannerWidget(default_extensions)
 
 class SensitiveInfoScannerWidget(QWidget):
+    # 详情页中最多列出的出现位置数
+    MAX_DETAIL_OCCURRENCES = 200
+
     def __init__(self, default_extensions):
         super().__init__()
         self.scan_dir = os.getcwd()
         self.default_extensions = default_extensions
         self.scanner = None
-        self.results = []
+        self.index = FindingsIndex()  # 按 (规则, 密钥指纹) 聚合的结果
+        self.model = FindingsModel(self.index)
+        self.resolver = ContextResolver()  # 显示或导出时按需取回上下文
+        self.sink_path = None
         self.init_ui()
 
     def init_ui(self):
@@ -263,9 +736,29 @@ class SensitiveInfoScannerWidget(QWidget):
         size_layout = QHBoxLayout()
         self.size_label = QLabel("最大文件大小(MB):")
         self.size_input = QLineEdit("10")
-        self.size_input.setToolTip("大于此大小的文件将被跳过")
+        self.size_input.setToolTip("大于此大小的文件将被跳过，或在启用分块扫描时按块扫描")
+        self.large_file_check = QCheckBox("分块扫描大文件")
+        self.large_file_check.setChecked(True)
+        self.large_file_check.setToolTip("使用内存映射分块扫描超过大小限制的文件（如日志、SQL导出）")
+        self.cache_check = QCheckBox("增量扫描")
+        self.cache_check.setChecked(True)
+        self.cache_check.setToolTip("缓存每个文件的指纹和扫描结果，重复扫描时只重新扫描有变化的文件")
+        self.binary_strings_check = QCheckBox("提取二进制字符串")
+        self.binary_strings_check.setChecked(False)
+        self.binary_strings_check.setToolTip("对识别为二进制的文件提取可打印字符串后扫描；不勾选时直接跳过二进制文件")
+        self.archive_check = QCheckBox("扫描压缩包")
+        self.archive_check.setChecked(True)
+        self.archive_check.setToolTip("在内存中扫描 zip/jar/war/apk/tar 等压缩包内的文件，无需先解压到磁盘")
         size_layout.addWidget(self.size_label)
         size_layout.addWidget(self.size_input)
+        size_layout.addWidget(self.large_file_check)
+        size_layout.addWidget(self.cache_check)
+        size_layout.addWidget(self.binary_strings_check)
+        size_layout.addWidget(self.archive_check)
+        self.git_history_check = QCheckBox("扫描 Git 历史")
+        self.git_history_check.setChecked(False)
+        self.git_history_check.setToolTip("扫描仓库所有提交中的文件版本（包括已删除的文件），结果标注首次出现的提交")
+        size_layout.addWidget(self.git_history_check)
         
         # 排除目录
         exclude_layout = QHBoxLayout()
@@ -275,9 +768,22 @@ class SensitiveInfoScannerWidget(QWidget):
         exclude_layout.addWidget(self.exclude_label)
         exclude_layout.addWidget(self.exclude_input)
         
+        # 规则包
+        rules_layout = QHBoxLayout()
+        self.rules_label = QLabel("规则包:")
+        self.rules_input = QLineEdit()
+        self.rules_input.setPlaceholderText("可选，多个规则包用分号分隔")
+        self.rules_input.setToolTip("YAML/JSON 格式的规则包，与内置规则合并使用")
+        self.rules_browse_btn = QPushButton("浏览...")
+        self.rules_browse_btn.clicked.connect(self.browse_rule_packs)
+        rules_layout.addWidget(self.rules_label)
+        rules_layout.addWidget(self.rules_input)
+        rules_layout.addWidget(self.rules_browse_btn)
+        
         config_layout.addLayout(ext_layout)
         config_layout.addLayout(size_layout)
         config_layout.addLayout(exclude_layout)
+        config_layout.addLayout(rules_layout)
         config_group.setLayout(config_layout)
         
         # 控制按钮
@@ -290,10 +796,17 @@ class SensitiveInfoScannerWidget(QWidget):
         self.export_btn = QPushButton("导出结果")
         self.export_btn.setEnabled(False)
         self.export_btn.clicked.connect(self.export_results)
+        self.export_occurrences_check = QCheckBox("逐处导出")
+        self.export_occurrences_check.setChecked(False)
+        self.export_occurrences_check.setToolTip(
+            "JSONL/SARIF/CSV 中每处出现单独一条；不勾选时每个不同的敏感值一条，全部出现位置列在其中"
+            "（JSON 和文本格式始终按敏感值聚合）"
+        )
         
         control_layout.addWidget(self.scan_btn)
         control_layout.addWidget(self.stop_btn)
         control_layout.addWidget(self.export_btn)
+        control_layout.addWidget(self.export_occurrences_check)
         
         # 进度条
         self.progress_bar = QProgressBar()
@@ -305,16 +818,48 @@ class SensitiveInfoScannerWidget(QWidget):
         # 结果展示区域
         self.result_tabs = QTabWidget()
         
-        # 表格视图
-        self.result_table = QTreeWidget()
-        self.result_table.setHeaderLabels(["文件", "类型", "严重性", "匹配内容", "行号"])
+        # 结果过滤
+        filter_layout = QHBoxLayout()
+        self.severity_combo = QComboBox()
+        self.severity_combo.addItem("全部", None)
+        for severity in ["critical", "high", "medium", "low"]:
+            self.severity_combo.addItem(severity.capitalize(), severity)
+        self.severity_combo.currentIndexChanged.connect(self.apply_filter)
+        self.type_combo = QComboBox()
+        self.type_combo.addItem("全部", None)
+        self.type_combo.currentIndexChanged.connect(self.apply_filter)
+        self.file_filter_input = QLineEdit()
+        self.file_filter_input.setPlaceholderText("按文件路径过滤")
+        self.file_filter_input.textChanged.connect(self.apply_filter)
+        filter_layout.addWidget(QLabel("严重性:"))
+        filter_layout.addWidget(self.severity_combo)
+        filter_layout.addWidget(QLabel("类型:"))
+        filter_layout.addWidget(self.type_combo)
+        filter_layout.addWidget(QLabel("文件:"))
+        filter_layout.addWidget(self.file_filter_input, 1)
+        
+        # 表格视图（行按需从模型中取数据）
+        self.result_table = QTreeView()
+        self.result_table.setModel(self.model)
+        self.result_table.setRootIsDecorated(False)
+        self.result_table.setUniformRowHeights(True)
+        self.result_table.setSortingEnabled(True)
+        self.result_table.sortByColumn(2, Qt.AscendingOrder)
         self.result_table.setColumnWidth(0, 300)
         self.result_table.setColumnWidth(1, 150)
         self.result_table.setColumnWidth(2, 80)
         self.result_table.setColumnWidth(3, 300)
         self.result_table.setColumnWidth(4, 60)
+        self.result_table.setColumnWidth(5, 60)
         self.result_table.header().setSectionResizeMode(QHeaderView.Interactive)
-        self.result_table.itemDoubleClicked.connect(self.show_detail)
+        self.result_table.doubleClicked.connect(self.show_detail)
+        
+        result_widget = QWidget()
+        result_layout = QVBoxLayout()
+        result_layout.setContentsMargins(0, 0, 0, 0)
+        result_layout.addLayout(filter_layout)
+        result_layout.addWidget(self.result_table)
+        result_widget.setLayout(result_layout)
         
         # 详情视图
         self.detail_view = QTextEdit()
@@ -322,7 +867,7 @@ class SensitiveInfoScannerWidget(QWidget):
         self.detail_view.setPlaceholderText("双击表格中的项目查看详情...")
         
         # 添加标签页
-        self.result_tabs.addTab(self.result_table, "扫描结果")
+        self.result_tabs.addTab(result_widget, "扫描结果")
         self.result_tabs.addTab(self.detail_view, "详情")
         
         # 组装界面
@@ -343,6 +888,13 @@ class SensitiveInfoScannerWidget(QWidget):
             self.scan_dir = dir_path
             self.dir_input.setText(dir_path)
     
+    def browse_rule_packs(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "选择规则包", "", "规则包 (*.yml *.yaml *.json)"
+        )
+        if file_paths:
+            self.rules_input.setText("; ".join(file_paths))
+    
     def start_scan(self):
         scan_dir = self.dir_input.text().strip()
         if not scan_dir:
@@ -366,16 +918,38 @@ class SensitiveInfoScannerWidget(QWidget):
         exclude_text = self.exclude_input.text().strip()
         exclude_dirs = [d.strip() for d in exclude_text.split(',')] if exclude_text else []
         
+        # 获取规则包
+        rules_text = self.rules_input.text().strip()
+        rule_packs = [path.strip() for path in rules_text.split(';') if path.strip()]
+        
         # 重置UI状态
-        self.result_table.clear()
+        self.index.clear()
+        self.model.reset()
+        self.resolver.close()
+        self.resolver = ContextResolver(scan_dir)
+        self.sink_path = new_sink_path()
+        self.type_combo.blockSignals(True)
+        self.type_combo.clear()
+        self.type_combo.addItem("全部", None)
+        self.type_combo.blockSignals(False)
         self.detail_view.clear()
         self.export_btn.setEnabled(False)
         self.progress_bar.setValue(0)
         self.status_label.setText("正在准备扫描...")
         
         # 创建扫描器
-        self.scanner = SensitiveInfoScannerThread(scan_dir, file_extensions, max_file_size, exclude_dirs)
+        self.scanner = SensitiveInfoScannerThread(
+            scan_dir, file_extensions, max_file_size, exclude_dirs,
+            scan_large_files=self.large_file_check.isChecked(),
+            use_cache=self.cache_check.isChecked(),
+            binary_strings=self.binary_strings_check.isChecked(),
+            scan_archives=self.archive_check.isChecked(),
+            rule_packs=rule_packs,
+            sink_path=self.sink_path,
+            git_history=self.git_history_check.isChecked()
+        )
         self.scanner.progress.connect(self.update_progress)
+        self.scanner.results_found.connect(self.append_results)
         self.scanner.scan_finished.connect(self.scan_finished)
         self.scanner.error_occurred.connect(self.handle_error)
         
@@ -393,125 +967,126 @@ class SensitiveInfoScannerWidget(QWidget):
             self.scan_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
     
-    def scan_finished(self, results):
+    def scan_finished(self, summary):
         # 更新按钮状态
         self.scan_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
-        self.export_btn.setEnabled(bool(results))
-        
-        # 保存结果
-        self.results = results
-        
-        # 显示结果
-        self.display_results(results)
+        self.export_btn.setEnabled(bool(self.index))
+        self.sink_path = summary["sink_path"]
         
         # 更新状态
-        if results:
-            self.status_label.setText(f"扫描完成! 发现 {len(results)} 条敏感信息")
+        unique = f"（{len(self.index)} 个不同的敏感值）"
+        if summary["stopped"]:
+            self.status_label.setText(f"扫描已停止! 已发现 {summary['total']} 条敏感信息{unique}")
+        elif summary["total"]:
+            self.status_label.setText(f"扫描完成! 发现 {summary['total']} 条敏感信息{unique}")
         else:
             self.status_label.setText("扫描完成! 未发现敏感信息")
     
-    def display_results(self, results):
-        """在表格中显示扫描结果"""
-        self.result_table.clear()
-        
-        # 按严重性分组
-        groups = {}
-        for result in results:
-            severity = result["severity"]
-            if severity not in groups:
-                groups[severity] = []
-            groups[severity].append(result)
-        
-        # 按严重性排序（critical > high > medium > low）
-        severity_order = ["critical", "high", "medium", "low"]
-        for severity in severity_order:
-            if severity in groups:
-                group_item = QTreeWidgetItem(self.result_table, [f"{severity.capitalize()} 风险", "", "", "", ""])
-                group_item.setExpanded(True)
-                
-                # 设置颜色
-                if severity == "critical":
-                    group_item.setBackground(0, QBrush(QColor(255, 200, 200)))
-                elif severity == "high":
-                    group_item.setBackground(0, QBrush(QColor(255, 225, 200)))
-                elif severity == "medium":
-                    group_item.setBackground(0, QBrush(QColor(255, 255, 200)))
-                
-                for result in groups[severity]:
-                    file_name = os.path.basename(result["file"])
-                    file_path = result["file"]
-                    match_preview = result["match"][:50] + ("..." if len(result["match"]) > 50 else "")
-                    
-                    item = QTreeWidgetItem(group_item, [
-                        file_name,
-                        result["type"],
-                        severity.capitalize(),
-                        match_preview,
-                        str(result["line"])
-                    ])
-                    item.setData(0, Qt.UserRole, result)
-                    
-                    # 设置颜色
-                    if severity == "critical":
-                        item.setBackground(2, QBrush(QColor(255, 200, 200)))
-                    elif severity == "high":
-                        item.setBackground(2, QBrush(QColor(255, 225, 200)))
+    def append_results(self, results):
+        """扫描过程中逐批追加结果，界面无需等待扫描结束"""
+        added, updated = self.index.add(results)
+        self.display_results(added, updated)
+        self.export_btn.setEnabled(True)
     
-    def show_detail(self, item, column):
+    def display_results(self, added, updated):
+        """通知模型有新增或更新的分组，新出现的类型加入类型过滤列表"""
+        for kind in self.model.add_groups(added, updated):
+            self.type_combo.addItem(kind, kind)
+    
+    def apply_filter(self):
+        self.model.set_filter(
+            self.severity_combo.currentData(),
+            self.type_combo.currentData(),
+            self.file_filter_input.text().strip()
+        )
+    
+    def show_detail(self, index):
         """显示选中项的详细信息"""
-        result = item.data(0, Qt.UserRole)
-        if not result:
+        group = self.model.group_at(index)
+        if group is None:
             return
+        result = self.index.groups[group]
+        count = self.index.count(group)
+        commit_line = f"首次出现的提交: {result['commit']}\n" if result.get('commit') else ""
         
         detail_text = f"""=== 敏感信息详情 ===
 文件: {result['file']}
 类型: {result['type']}
 严重性: {result['severity'].capitalize()}
 行号: {result['line']}
+列号: {result.get('column', '')}
+{commit_line}出现次数: {count}（{self.index.file_count(group)} 个文件）
 
 匹配内容:
 {result['match']}
 
 上下文:
-...{result['context']}...
+...{self.resolver.context(result)}...
+
+出现位置:
 """
+        # 出现位置可能非常多，详情中只列出前面一部分，完整列表见导出结果
+        for number, (path, line, column) in enumerate(self.index.iter_occurrences(group)):
+            if number >= self.MAX_DETAIL_OCCURRENCES:
+                detail_text += f"... 其余 {count - number} 处见导出结果\n"
+                break
+            detail_text += f"{path}:{line}:{column}\n"
         self.detail_view.setText(detail_text)
         self.result_tabs.setCurrentIndex(1)  # 切换到详情标签页
     
     def export_results(self):
         """导出扫描结果"""
-        if not self.results:
+        if not self.index:
             QMessageBox.information(self, "导出结果", "没有结果可导出")
             return
         
         file_path, _ = QFileDialog.getSaveFileName(
-            self, "导出扫描结果", "", "JSON 文件 (*.json);;文本文件 (*.txt)"
+            self, "导出扫描结果", "",
+            "JSON 文件 (*.json);;JSON Lines (*.jsonl);;SARIF (*.sarif);;CSV 文件 (*.csv);;文本文件 (*.txt)"
         )
         
         if not file_path:
             return
         
         try:
-            if file_path.endswith('.json'):
-                # 导出为JSON
+            fmt = export_format(file_path)
+            if fmt:
+                # 流式导出：默认每个不同的敏感值一条（SARIF 的 locations 中列出全部出现位置），
+                # 勾选逐处导出时从磁盘上的结果文件逐条读取，每处出现一条
+                if self.export_occurrences_check.isChecked() and self.sink_path and os.path.exists(self.sink_path):
+                    findings = iter_sink(self.sink_path)
+                else:
+                    findings = self.index.iter_aggregated()
+                export_findings(self.resolver.with_context(findings), file_path, fmt, base_dir=self.dir_input.text().strip() or None)
+            elif file_path.endswith('.json'):
+                # 导出为JSON，每个不同的敏感值一条，附带全部出现位置（逐条写入，不拼接整个列表）
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.results, f, indent=2, ensure_ascii=False)
+                    f.write("[")
+                    for number, result in enumerate(self.resolver.with_context(self.index.iter_aggregated())):
+                        f.write(",\n" if number else "\n")
+                        f.write(json.dumps(result, indent=2, ensure_ascii=False))
+                    f.write("\n]\n")
             else:
                 # 导出为文本
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write("=== 敏感信息扫描结果 ===\n")
                     f.write(f"扫描时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
                     f.write(f"扫描目录: {self.dir_input.text()}\n")
-                    f.write(f"发现 {len(self.results)} 条敏感信息\n\n")
+                    f.write(f"发现 {self.index.total} 条敏感信息（{len(self.index)} 个不同的敏感值）\n\n")
                     
-                    for result in self.results:
+                    for group in range(len(self.index)):
+                        result = self.index.groups[group]
                         f.write(f"文件: {result['file']}\n")
                         f.write(f"类型: {result['type']}\n")
                         f.write(f"严重性: {result['severity']}\n")
                         f.write(f"行号: {result['line']}\n")
+                        f.write(f"列号: {result.get('column', '')}\n")
                         f.write(f"匹配内容: {result['match']}\n")
-                        f.write(f"上下文: ...{result['context']}...\n")
+                        f.write(f"上下文: ...{self.resolver.context(result)}...\n")
+                        f.write(f"出现次数: {self.index.count(group)}\n")
+                        for path, line, column in self.index.iter_occurrences(group):
+                            f.write(f"    {path}:{line}:{column}\n")
                         f.write("-" * 80 + "\n")
             
             QMessageBox.information(self, "导出成功", f"结果已导出到: {file_path}")
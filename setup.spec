@@ -33,8 +33,34 @@ a = Analysis(['main.py'],
                  # 核心模块
                  'core',
                  'core.plugin_manager',
+                 'core.rule_pack',
+                 'core.archive_scanner',
+                 'core.blob_store',
+                 'core.content_sniffer',
+                 'core.crawl_state',
+                 'core.file_walker',
+                 'core.finding_context',
+                 'core.findings_export',
+                 'core.findings_store',
+                 'core.git_history',
+                 'core.http_cache',
+                 'core.http_transport',
+                 'core.link_extractor',
                  'core.scanner',
+                 'core.scan_cache',
+                 'core.scan_pipeline',
+                 'core.sensitive_engine',
+                 'core.sensitive_rules',
+                 'core.url_frontier',
                  'core.utils',
+                 'core.validators',
+                 # 可选依赖（网站下载器的 HTTP/2 和压缩格式支持）
+                 'httpx',
+                 'h2',
+                 'brotli',
+                 'zstandard',
+                 # 可选依赖（YAML 格式的规则包）
+                 'yaml',
              ],
              hookspath=[],
              runtime_hooks=[],